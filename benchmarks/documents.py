@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Measures the document model on large synthetic dashboards.
+
+Usage: python benchmarks/documents.py [-d DASHBOARDS] [-r ROWS] [-p PANELS] [-n RUNS]
+"""
+import os
+import sys
+import copy
+import time
+import argparse
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+
+sys.path.append(LIB_PATH)
+
+from grafcli.documents import Dashboard, Row
+from grafcli.utils import json_pretty
+
+
+def panel_source(id):
+    return {
+        'id': id,
+        'title': "Requests per second {}".format(id),
+        'type': 'graph',
+        'span': 4,
+        'targets': [{'refId': 'A', 'target': 'sum(rate(requests_total[5m]))'}],
+    }
+
+
+def row_source(index, panels):
+    return {
+        'title': "Row number {}".format(index),
+        'panels': [panel_source(index * panels + i + 1) for i in range(panels)],
+    }
+
+
+def dashboard_source(rows, panels):
+    return {
+        'title': "Synthetic dashboard",
+        'rows': [row_source(i, panels) for i in range(rows)],
+    }
+
+
+def load(sources):
+    """Whole dashboard operations: backup, cp and export."""
+    for i, source in enumerate(sources):
+        Dashboard(source, str(i)).source
+
+
+def navigate(sources):
+    """Listing every row and panel, as ls and TAB-completion do."""
+    for i, source in enumerate(sources):
+        for row in Dashboard(source, str(i)).rows:
+            for panel in row.panels:
+                panel.name
+
+
+def read_source(sources):
+    """Repeated reads of a navigated dashboard, as in cat, save and slug matching."""
+    for i, source in enumerate(sources):
+        dashboard = Dashboard(source, str(i))
+        dashboard.row('1-any')
+        for _ in range(10):
+            dashboard.slug
+            dashboard.source
+
+
+def pretty(sources):
+    """Printing navigated dashboards, as cat and export do."""
+    for i, source in enumerate(sources):
+        dashboard = Dashboard(source, str(i))
+        dashboard.rows
+        json_pretty(dashboard.source)
+
+
+def copy_row(sources):
+    """Pasting a row into another dashboard."""
+    for i, source in enumerate(sources):
+        dashboard = Dashboard(source, str(i))
+        row = Row(copy.deepcopy(source['rows'][0]))
+        dashboard.update(row)
+        dashboard.move_child("{}-any".format(len(dashboard.rows)), '1')
+        dashboard.source
+
+
+BENCHMARKS = (load, navigate, read_source, pretty, copy_row)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-d', '--dashboards', type=int, default=50)
+    parser.add_argument('-r', '--rows', type=int, default=20)
+    parser.add_argument('-p', '--panels', type=int, default=25)
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print("{} dashboards, {} rows, {} panels per row".format(args.dashboards, args.rows, args.panels))
+
+    for benchmark in BENCHMARKS:
+        times = []
+        for _ in range(args.runs):
+            sources = [dashboard_source(args.rows, args.panels)
+                       for _ in range(args.dashboards)]
+
+            start = time.perf_counter()
+            benchmark(sources)
+            times.append(time.perf_counter() - start)
+
+        print("{:<12} {:8.1f} ms".format(benchmark.__name__, min(times) * 1000))
+
+
+if __name__ == "__main__":
+    main()
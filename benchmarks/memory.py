@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Reports peak RSS of loading and navigating many synthetic dashboards.
+
+Usage: python benchmarks/memory.py [-d DASHBOARDS] [-r ROWS] [-p PANELS]
+
+Each measurement runs in a fresh interpreter, so peaks do not carry over.
+"""
+import os
+import sys
+import argparse
+import resource
+import subprocess
+
+from documents import dashboard_source
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+
+sys.path.append(LIB_PATH)
+
+from grafcli.documents import Dashboard
+
+MODES = ('sources', 'dashboards')
+
+
+def peak_rss():
+    # Kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024
+
+    return peak
+
+
+def measure(mode, dashboards, rows, panels):
+    documents = []
+    for i in range(dashboards):
+        source = dashboard_source(rows, panels)
+
+        if mode == 'dashboards':
+            dashboard = Dashboard(source, str(i))
+            for row in dashboard.rows:
+                row.panels
+            documents.append(dashboard)
+        else:
+            documents.append(source)
+
+    return peak_rss()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-d', '--dashboards', type=int, default=1000)
+    parser.add_argument('-r', '--rows', type=int, default=10)
+    parser.add_argument('-p', '--panels', type=int, default=10)
+    parser.add_argument('--mode', choices=MODES)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(measure(args.mode, args.dashboards, args.rows, args.panels))
+        return
+
+    print("{} dashboards, {} rows, {} panels per row".format(args.dashboards, args.rows, args.panels))
+
+    peaks = {}
+    for mode in MODES:
+        output = subprocess.check_output([sys.executable, __file__, '--mode', mode,
+                                          '-d', str(args.dashboards),
+                                          '-r', str(args.rows),
+                                          '-p', str(args.panels)])
+        peaks[mode] = int(output)
+        print("{:<12} {:8.1f} MB peak RSS".format(mode, peaks[mode] / 1024))
+
+    documents = peaks['dashboards'] - peaks['sources']
+    per_panel = documents * 1024 / (args.dashboards * args.rows * args.panels)
+    print("{:<12} {:8.1f} MB, {:.0f} bytes per panel".format('documents', documents / 1024, per_panel))
+
+
+if __name__ == "__main__":
+    main()
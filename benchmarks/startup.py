@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Measures wall time of short grafcli invocations, as run from cron or CI.
+
+Usage: python benchmarks/startup.py [-n RUNS] [command ...]
+
+A sqlite host named "bench" is configured, e.g. try "ls /remote/bench".
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+SCRIPT_PATH = os.path.join(LIB_PATH, 'scripts', 'grafcli')
+
+HEAVY_MODULES = ('pygments', 'requests', 'elasticsearch', 'mysql', 'psycopg2', 'sqlite3')
+
+CONFIG = """
+[grafcli]
+editor = vim
+mergetool = vimdiff
+history =
+verbose = off
+force = on
+colorize = off
+
+[resources]
+data-dir = {data_dir}
+
+[hosts]
+bench = on
+
+[bench]
+type = sqlite
+path = {data_dir}/grafana.db
+"""
+
+SCHEMA = """CREATE TABLE dashboard (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                version INTEGER NOT NULL,
+                slug TEXT NOT NULL,
+                title TEXT NOT NULL,
+                data TEXT NOT NULL,
+                org_id INTEGER NOT NULL,
+                created DATETIME NOT NULL,
+                updated DATETIME NOT NULL)"""
+
+IMPORTED = """
+import sys
+sys.path.insert(0, {lib_path!r})
+sys.argv = ['grafcli'] + {command!r}
+from grafcli.core import GrafCLI
+GrafCLI().execute(*sys.argv[1:])
+print(','.join(name for name in {modules!r} if name in sys.modules))
+"""
+
+
+def run(command, cwd):
+    env = dict(os.environ, PYTHONPATH=LIB_PATH)
+    start = time.perf_counter()
+    subprocess.check_call([sys.executable, SCRIPT_PATH] + command,
+                          cwd=cwd, env=env, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def imported_modules(command, cwd):
+    code = IMPORTED.format(lib_path=LIB_PATH, command=command, modules=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=cwd)
+    return output.decode().strip()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--runs', type=int, default=20)
+    parser.add_argument('command', nargs='*', default=['ls', '/'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        with open(os.path.join(data_dir, 'grafcli.conf'), 'w') as f:
+            f.write(CONFIG.format(data_dir=data_dir))
+
+        with sqlite3.connect(os.path.join(data_dir, 'grafana.db')) as connection:
+            connection.execute(SCHEMA)
+
+        # Warm up bytecode caches
+        run(args.command, data_dir)
+        times = [run(args.command, data_dir) for _ in range(args.runs)]
+        modules = imported_modules(args.command, data_dir)
+
+    print("command:  grafcli {}".format(' '.join(args.command)))
+    print("runs:     {}".format(args.runs))
+    print("min:      {:.1f} ms".format(min(times) * 1000))
+    print("median:   {:.1f} ms".format(statistics.median(times) * 1000))
+    print("imported: {}".format(modules or '-'))
+
+
+if __name__ == "__main__":
+    main()
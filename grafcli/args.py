@@ -1,7 +1,16 @@
+import argparse
 from climb.args import Args
 from climb.config import config
 
 
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("{} is not a positive number".format(value))
+
+    return number
+
+
 class GrafArgs(Args):
 
     def _load_commands(self):
@@ -42,13 +51,32 @@ class GrafArgs(Args):
         pos.add_argument("position", nargs="?", help="absolute or relative position to be set")
 
         backup = self._add_command("backup", "backup all dashboards from remote host")
+        self._add_batch_arguments(backup, "fetched")
         backup.add_argument("path", nargs="?", default=None, help="remote host path")
         backup.add_argument("system_path", nargs="?", default=None, help="system path for .tgz file")
 
         restore = self._add_command("restore", "restore saved backup")
+        self._add_batch_arguments(restore, "restored", batch_size=None)
+        restore.add_argument("--resume", action="store_true", default=False, help="skip dashboards already restored according to manifest")
+        restore.add_argument("--manifest", default=None, help="manifest file path (defaults to <system_path>.manifest)")
         restore.add_argument("system_path", nargs="?", default=None, help="system path for .tgz file")
         restore.add_argument("path", nargs="?", default=None, help="remote host path")
 
+        sync = self._add_command("sync", "copy added and changed dashboards from one location to another")
+        sync.add_argument("-n", action="store_true", default=False, help="only show what would be done", dest="dry_run")
+        self._add_batch_arguments(sync, "fetched")
+        sync.add_argument("--delete", action="store_true", default=False, help="remove dashboards missing in source")
+        sync.add_argument("source", nargs="?", default=None, help="source path")
+        sync.add_argument("destination", nargs="?", default=None, help="destination path")
+
+        snapshot = self._add_command("snapshot", "store dashboards as a new snapshot in history")
+        self._add_batch_arguments(snapshot, "fetched")
+        snapshot.add_argument("path", nargs="?", default=None, help="path of dashboards")
+        snapshot.add_argument("history", nargs="?", default=None, help="name of snapshots history")
+
+        gc = self._add_command("gc", "remove blobs no longer used by dashboards")
+        gc.add_argument("path", nargs="?", default=None, help="path of dashboards (defaults to current)")
+
         file_export = self._add_command("export", "export resource to file")
         file_export.add_argument("path", nargs="?", default=None, help="resource path")
         file_export.add_argument("system_path", nargs="?", default=None, help="system path")
@@ -59,3 +87,11 @@ class GrafArgs(Args):
         file_import.add_argument("system_path", nargs="?", default=None, help="system path")
         file_import.add_argument("path", nargs="?", default=None, help="resource path")
         file_import.set_defaults(command='file_import')
+
+    def _add_batch_arguments(self, command, action, batch_size=1):
+        batch_size_help = "number of dashboards {} in one batch".format(action)
+        if batch_size is None:
+            batch_size_help += " (defaults to batch-size of the host)"
+
+        command.add_argument("-j", type=positive_int, default=1, help="number of batches {} concurrently".format(action), dest="jobs")
+        command.add_argument("-b", type=positive_int, default=batch_size, help=batch_size_help, dest="batch_size")
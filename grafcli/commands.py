@@ -1,9 +1,12 @@
+import io
 import os
 import re
 import json
-import shutil
+import time
 import tarfile
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from climb.config import config
 from climb.commands import Commands, command, completers
 from climb.exceptions import CLIException
@@ -12,8 +15,18 @@ from climb.paths import format_path, split_path, ROOT_PATH
 from grafcli.documents import Document, Dashboard, Row, Panel
 from grafcli.exceptions import CommandCancelled
 from grafcli.resources import Resources
+from grafcli.resources.hashes import ContentHashes
 from grafcli.storage.system import to_file_format, from_file_format
-from grafcli.utils import json_pretty
+from grafcli.utils import json_pretty, json_loads, content_hash
+
+MANIFEST_SUFFIX = '.manifest'
+
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_CANCELLED = 'cancelled'
+
+# Set by Grafana on each host separately
+SYNC_IGNORED_FIELDS = ('id', 'version')
 
 
 class GrafCommands(Commands):
@@ -22,6 +35,10 @@ class GrafCommands(Commands):
         super().__init__(cli)
         self._resources = Resources()
 
+    @property
+    def resources(self):
+        return self._resources
+
     @command
     @completers('path')
     def ls(self, path=None):
@@ -57,6 +74,11 @@ class GrafCommands(Commands):
         destination = source.pop(-1)
         destination_path = format_path(self._cli.current_path, destination)
 
+        if self._can_batch(source, destination_path, match_slug):
+            for source_path in self._copy_batch(source, destination_path):
+                self._cli.log("cp: {} -> {}", source_path, destination_path)
+            return
+
         for path in source:
             source_path = format_path(self._cli.current_path, path)
 
@@ -77,6 +99,12 @@ class GrafCommands(Commands):
         destination = source.pop(-1)
         destination_path = format_path(self._cli.current_path, destination)
 
+        if self._can_batch(source, destination_path, match_slug):
+            for source_path in self._copy_batch(source, destination_path):
+                self._resources.remove(source_path)
+                self._cli.log("mv: {} -> {}", source_path, destination_path)
+            return
+
         for path in source:
             source_path = format_path(self._cli.current_path, path)
             document = self._resources.get(source_path)
@@ -188,7 +216,7 @@ class GrafCommands(Commands):
 
     @command
     @completers('path', 'system_path')
-    def backup(self, path, system_path):
+    def backup(self, path, system_path, jobs=1, batch_size=1):
         if not path:
             raise CLIException("No path provided")
 
@@ -198,43 +226,246 @@ class GrafCommands(Commands):
         path = format_path(self._cli.current_path, path)
         system_path = os.path.expanduser(system_path)
 
-        documents = self._resources.list(path)
+        if self._resources.supports_batch(path):
+            documents = sorted(self._resources.list_dashboards(path))
+        else:
+            documents = sorted(self._resources.list(path))
+
         if not documents:
             raise CLIException("Nothing to backup")
 
-        tmp_dir = tempfile.mkdtemp()
-        archive = tarfile.open(name=system_path, mode="w:gz")
+        batches = [documents[i:i+batch_size]
+                   for i in range(0, len(documents), batch_size)]
+
+        def fetch(batch):
+            if batch_size == 1:
+                return [self._resources.get(os.path.join(path, batch[0]))]
+
+            return self._resources.get_many(path, batch)
+
+        def write(batch, future):
+            for doc_name, document in zip(batch, future.result()):
+                file_name = to_file_format(doc_name)
+                add_to_archive(archive, file_name, json_pretty(document.source))
+
+                self._cli.log("backup: {} -> {}", os.path.join(path, doc_name), file_name)
+
+        with tarfile.open(name=system_path, mode="w:gz") as archive, \
+                ThreadPoolExecutor(max_workers=jobs) as executor:
+            pending = deque()
 
-        for doc_name in documents:
-            file_name = to_file_format(doc_name)
-            file_path = os.path.join(tmp_dir, file_name)
-            doc_path = os.path.join(path, doc_name)
+            for batch in batches:
+                pending.append((batch, executor.submit(fetch, batch)))
 
-            self.file_export(doc_path, file_path)
-            archive.add(file_path, arcname=file_name)
+                # Bound the number of documents held in memory, writing them
+                # in submission order keeps the archive deterministic
+                if len(pending) >= jobs * 2:
+                    write(*pending.popleft())
 
-        archive.close()
-        shutil.rmtree(tmp_dir)
+            while pending:
+                write(*pending.popleft())
 
     @command
     @completers('system_path', 'path')
-    def restore(self, system_path, path):
+    def restore(self, system_path, path, jobs=1, resume=False, manifest=None, batch_size=None):
         system_path = os.path.expanduser(system_path)
         path = format_path(self._cli.current_path, path)
 
-        tmp_dir = tempfile.mkdtemp()
-        with tarfile.open(name=system_path, mode="r:gz") as archive:
-            archive.extractall(path=tmp_dir)
+        if batch_size is None:
+            # e.g. Elastic hosts write through the bulk API
+            batch_size = self._resources.batch_size(path) if self._resources.supports_batch(path) else 1
+
+        # Overwrite prompts from concurrent workers would interleave
+        if jobs > 1 and not config['grafcli'].getboolean('force'):
+            raise CLIException("Restoring with more than one job requires force = on")
+
+        if manifest:
+            manifest_path = os.path.expanduser(manifest)
+        else:
+            manifest_path = system_path + MANIFEST_SUFFIX
+
+        restored = read_manifest(manifest_path) if resume else set()
+        counts = {STATUS_DONE: 0, STATUS_FAILED: 0, STATUS_CANCELLED: 0}
+
+        def restore_batch(batch):
+            names = [from_file_format(file_name) for file_name, _ in batch]
+            skipped = []
 
-        for name in os.listdir(tmp_dir):
             try:
-                file_path = os.path.join(tmp_dir, name)
-                doc_path = os.path.join(path, from_file_format(name))
-                self.file_import(file_path, doc_path)
+                if batch_size == 1:
+                    content = batch[0][1]
+                    self._import_content(content, os.path.join(path, names[0]))
+                else:
+                    documents = [Document.from_source(json_loads(content))
+                                 for _, content in batch]
+                    skipped = self._resources.save_many(path, list(zip(names, documents)))
             except CommandCancelled:
-                pass
+                status, error = STATUS_CANCELLED, None
+            except Exception as exc:
+                status, error = STATUS_FAILED, str(exc)
+            else:
+                status, error = STATUS_DONE, None
+
+            return [(file_name, os.path.join(path, name),
+                     STATUS_CANCELLED if name in skipped else status, error)
+                    for (file_name, _), name in zip(batch, names)]
+
+        def record(futures):
+            for future in futures:
+                for file_name, doc_path, status, error in future.result():
+                    write_manifest_entry(manifest_file, file_name, status, error)
+
+                    counts[status] += 1
+                    self._cli.log("restore: {} -> {} {} ({} done, {} failed)",
+                                  file_name, doc_path, status,
+                                  counts[STATUS_DONE], counts[STATUS_FAILED])
+
+        with open(manifest_path, 'a' if resume else 'w') as manifest_file, \
+                tarfile.open(name=system_path, mode="r|gz") as archive, \
+                ThreadPoolExecutor(max_workers=jobs) as executor:
+            pending = set()
+            batch = []
+
+            # Stream mode lets importing start before the whole archive is read
+            for member in archive:
+                if not member.isfile():
+                    continue
+
+                file_name = os.path.basename(member.name)
+                if file_name in restored:
+                    self._cli.log("restore: {} already restored, skipping", file_name)
+                    continue
+
+                content = archive.extractfile(member).read().decode('utf-8')
+                batch.append((file_name, content))
 
-        shutil.rmtree(tmp_dir)
+                if len(batch) < batch_size:
+                    continue
+
+                pending.add(executor.submit(restore_batch, batch))
+                batch = []
+
+                # Bound the number of documents held in memory
+                if len(pending) >= jobs * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    record(finished)
+
+            if batch:
+                pending.add(executor.submit(restore_batch, batch))
+
+            record(wait(pending).done)
+
+        if counts[STATUS_FAILED]:
+            raise CLIException("Failed to restore {} dashboard(s), see {}"
+                               .format(counts[STATUS_FAILED], manifest_path))
+
+    @command
+    @completers('path')
+    def sync(self, source, destination, dry_run=False, jobs=1, batch_size=1, delete=False):
+        if not source or not destination:
+            raise CLIException("Provide source and destination paths")
+
+        source = format_path(self._cli.current_path, source)
+        destination = format_path(self._cli.current_path, destination)
+
+        for path in (source, destination):
+            if not self._resources.supports_batch(path):
+                raise CLIException("Can not sync {}, provide path of dashboards".format(path))
+
+        source_entries = {entry['slug']: entry
+                          for entry in self._resources.list_metadata(source)}
+        destination_entries = {entry['slug']: entry
+                               for entry in self._resources.list_metadata(destination)}
+
+        common = sorted(source_entries.keys() & destination_entries.keys())
+        added = sorted(source_entries.keys() - destination_entries.keys())
+        removed = sorted(destination_entries.keys() - source_entries.keys()) if delete else []
+
+        source_hashes = ContentHashes(source)
+        destination_hashes = ContentHashes(destination)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            source_dashboards = self._fetch_outdated(executor, source, source_hashes,
+                                                     [source_entries[name] for name in common + added],
+                                                     batch_size)
+            self._fetch_outdated(executor, destination, destination_hashes,
+                                 [destination_entries[name] for name in common],
+                                 batch_size)
+
+            changed = [name for name in common
+                       if source_hashes.get(name)['hash'] != destination_hashes.get(name)['hash']]
+
+            if not dry_run:
+                missing = [name for name in added + changed
+                           if name not in source_dashboards]
+                source_dashboards.update(self._fetch_dashboards(executor, source, missing, batch_size))
+
+        source_hashes.save()
+        destination_hashes.save()
+
+        actions = (["add: {}".format(name) for name in added] +
+                   ["update: {}".format(name) for name in changed] +
+                   ["remove: {}".format(name) for name in removed])
+
+        if dry_run:
+            return "\n".join(actions)
+
+        documents = [(name, source_dashboards[name]) for name in added]
+        for name in changed:
+            # Ids are set by each host, keep the one of the dashboard updated
+            updated = dict(source_dashboards[name].source, id=destination_hashes.get(name)['id'])
+            documents.append((name, Dashboard(updated, name)))
+
+        skipped = self._resources.save_many(destination, documents) if documents else []
+
+        for name in removed:
+            self._resources.remove(os.path.join(destination, name))
+
+        # Written dashboards got new versions, listing once more spares fetching them next time
+        written = [(name, document) for name, document in documents if name not in skipped]
+        if written:
+            listed = {entry['slug']: entry
+                      for entry in self._resources.list_metadata(destination)}
+
+            for name, document in written:
+                if name in listed:
+                    destination_hashes.put(listed[name], source_hashes.get(name)['hash'],
+                                           document.source.get('id'))
+
+        destination_hashes.discard(*skipped, *removed)
+        destination_hashes.save()
+
+        for action in actions:
+            self._cli.log("sync: {}", action)
+
+    @command
+    @completers('path')
+    def snapshot(self, path, history, jobs=1, batch_size=1):
+        if not path:
+            raise CLIException("No path provided")
+
+        if not history:
+            raise CLIException("No snapshots name provided")
+
+        path = format_path(self._cli.current_path, path)
+        if not self._resources.supports_batch(path):
+            raise CLIException("Can not snapshot {}, provide path of dashboards".format(path))
+
+        names = sorted(self._resources.list_dashboards(path))
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            dashboards = self._fetch_dashboards(executor, path, names, batch_size)
+
+        snapshot_id = self._resources.create_snapshot(history, dashboards)
+
+        self._cli.log("snapshot: {} -> /snapshots/{}/{}", path, history, snapshot_id)
+
+    @command
+    @completers('path')
+    def gc(self, path):
+        path = format_path(self._cli.current_path, path)
+        removed = self._resources.collect_garbage(path)
+
+        self._cli.log("gc: removed {} unreferenced blobs from {}", removed, path)
 
     @command
     @completers('path', 'system_path')
@@ -257,14 +488,56 @@ class GrafCommands(Commands):
         with open(system_path, 'r') as file:
             content = file.read()
 
-        document = Document.from_source(json.loads(content))
+        path = self._import_content(content, path, match_slug)
+
+        self._cli.log("import: {} -> {}", system_path, path)
+
+    def _import_content(self, content, path, match_slug=False):
+        document = Document.from_source(json_loads(content))
 
         if match_slug:
             path = self._match_slug(document, path)
 
         self._resources.save(path, document)
 
-        self._cli.log("import: {} -> {}", system_path, path)
+        return path
+
+    def _can_batch(self, source, destination_path, match_slug):
+        return (len(source) > 1 and not match_slug and
+                self._resources.supports_batch(destination_path))
+
+    def _copy_batch(self, source, destination_path):
+        """Saves source dashboards under destination in one batch, returns paths of those saved."""
+        source_paths = [format_path(self._cli.current_path, path) for path in source]
+        documents = [self._resources.get(path) for path in source_paths]
+        names = [document.id for document in documents]
+
+        skipped = self._resources.save_many(destination_path,
+                                            list(zip(names, documents)))
+
+        return [source_path for source_path, name in zip(source_paths, names)
+                if name not in skipped]
+
+    def _fetch_dashboards(self, executor, path, names, batch_size):
+        """Fetches dashboards from path in concurrent batches, returns them by name."""
+        batches = [names[i:i+batch_size]
+                   for i in range(0, len(names), batch_size)]
+
+        fetched = executor.map(lambda batch: self._resources.get_many(path, batch), batches)
+
+        return {name: dashboard
+                for batch, dashboards in zip(batches, fetched)
+                for name, dashboard in zip(batch, dashboards)}
+
+    def _fetch_outdated(self, executor, path, hashes, entries, batch_size):
+        """Fetches listed dashboards changed since their hashes were stored, storing new ones."""
+        entries = {entry['slug']: entry for entry in entries}
+        dashboards = self._fetch_dashboards(executor, path, hashes.outdated(entries.values()), batch_size)
+
+        for name, dashboard in dashboards.items():
+            hashes.put(entries[name], sync_hash(dashboard), dashboard.source.get('id'))
+
+        return dashboards
 
     def _match_slug(self, document, destination):
         pattern = re.compile(r'^\d+-{}$'.format(document.slug))
@@ -280,3 +553,51 @@ class GrafCommands(Commands):
             raise CLIException("Too many matching slugs, be more specific")
 
         return "{}/{}".format(destination, matches[0])
+
+
+def add_to_archive(archive, name, content):
+    data = content.encode('utf-8')
+
+    info = tarfile.TarInfo(name=name)
+    info.size = len(data)
+    info.mtime = time.time()
+    info.mode = 0o644
+
+    archive.addfile(info, io.BytesIO(data))
+
+
+def read_manifest(path):
+    """Returns names of archive members already restored according to manifest."""
+    if not os.path.isfile(path):
+        return set()
+
+    statuses = {}
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Last line may be truncated by an interrupted run
+                continue
+
+            statuses[entry['name']] = entry['status']
+
+    return {name for name, status in statuses.items()
+            if status == STATUS_DONE}
+
+
+def write_manifest_entry(file, name, status, error=None):
+    entry = {'name': name, 'status': status}
+    if error:
+        entry['error'] = error
+
+    file.write(json.dumps(entry) + '\n')
+    file.flush()
+
+
+def sync_hash(dashboard):
+    """Returns hash of dashboard content, ignoring fields that differ between hosts."""
+    source = {key: value for key, value in dashboard.source.items()
+              if key not in SYNC_IGNORED_FIELDS}
+
+    return content_hash(source)
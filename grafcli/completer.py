@@ -1,9 +1,32 @@
+import time
+import queue
+import threading
+from bisect import bisect_left
+from concurrent.futures import Future, TimeoutError
 from climb.completer import Completer
-from climb.paths import ROOT_PATH, SEPARATOR
+from climb.config import config
+from climb.paths import ROOT_PATH, SEPARATOR, format_path
+
+DEFAULT_TTL = 5.0
+DEFAULT_TIMEOUT = 0.5
 
 
 class GrafCompleter(Completer):
 
+    def __init__(self, cli):
+        super().__init__(cli)
+        self._ttl = config['grafcli'].getfloat('completion-ttl', DEFAULT_TTL)
+        self._timeout = config['grafcli'].getfloat('completion-timeout', DEFAULT_TIMEOUT)
+
+        # Path -> (time of listing, sorted sub-nodes)
+        self._candidates = {}
+        self._pending = {}
+
+        # Daemon, so that a listing hung on a slow host does not block exiting the shell
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._worker.start()
+
     def path(self, arg, text):
         if arg and not arg.endswith(SEPARATOR):
             # List one level up
@@ -12,10 +35,50 @@ class GrafCompleter(Completer):
             if absolute:
                 arg = ROOT_PATH + arg
 
-        paths = [p for p in self._cli.commands.ls(path=arg).split()
-                 if p.startswith(text)]
+        candidates = self._get_candidates(format_path(self._cli.current_path, arg))
+
+        paths = []
+        for candidate in candidates[bisect_left(candidates, text):]:
+            if not candidate.startswith(text):
+                break
+            paths.append(candidate)
 
         if len(paths) == 1:
             return ["{}/".format(paths[0])]
 
         return paths
+
+    def _get_candidates(self, path):
+        listed, candidates = self._candidates.get(path, (0, []))
+        if listed + self._ttl >= time.monotonic():
+            return candidates
+
+        future = self._pending.get(path)
+        if not future or future.done():
+            future = Future()
+            self._queue.put((future, path))
+            self._pending[path] = future
+
+        # Slow backend should not block typing, so fall back to (possibly stale) cache
+        try:
+            return future.result(timeout=self._timeout)
+        except TimeoutError:
+            return candidates
+        except Exception:
+            return []
+
+    def _work(self):
+        while True:
+            future, path = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(self._list(path))
+            except Exception as exc:
+                future.set_exception(exc)
+
+    def _list(self, path):
+        candidates = sorted(self._cli.commands.resources.list(path))
+        self._candidates[path] = (time.monotonic(), candidates)
+        return candidates
@@ -1,5 +1,8 @@
 import re
+import weakref
 from abc import ABCMeta, abstractmethod
+from collections import Counter
+from operator import attrgetter
 
 from grafcli.exceptions import InvalidPath, InvalidDocument, DocumentNotFound
 
@@ -23,6 +26,22 @@ def slug(name):
     return '-'.join(name.lower().split())
 
 
+def find_child(index, name, kind):
+    child = index.get(slug(name))
+    if not child:
+        raise DocumentNotFound("There is no {} {}".format(kind, name))
+
+    return child
+
+
+def insert_index(index, length):
+    """Returns position at which list.insert(index, ...) places the item."""
+    if index < 0:
+        index = max(index + length, 0)
+
+    return min(index, length)
+
+
 def relative_index(index, position):
     if position.startswith('+'):
         index += int(position[1:])
@@ -34,10 +53,90 @@ def relative_index(index, position):
     return index
 
 
+class PanelIds(object):
+    """Panel ids in use, so new ids are allocated without rescanning panels."""
+    __slots__ = ('_counts', '_max')
+
+    def __init__(self):
+        self._counts = Counter()
+        self._max = 0
+
+    def add(self, id):
+        self._counts[id] += 1
+        if self._max is not None and id > self._max:
+            self._max = id
+
+    def remove(self, id):
+        self._counts[id] -= 1
+        if self._counts[id] <= 0:
+            del self._counts[id]
+            if id == self._max:
+                # Found again on next allocation, so removing many panels stays linear
+                self._max = None
+
+    def max(self):
+        if self._max is None:
+            self._max = max(self._counts, default=0)
+
+        return self._max
+
+    def allocate(self):
+        id = self.max() + 1
+        self.add(id)
+        return id
+
+
+class ChildIndex(object):
+    """Child documents by key, the first one added wins on duplicates.
+
+    Callers remove a child before changing what its key is computed from.
+    """
+    __slots__ = ('_key', '_children')
+
+    def __init__(self, key, children=()):
+        self._key = key
+        # Keys map to a child, or to a list of children if repeated
+        self._children = {}
+
+        for child in children:
+            self.add(child)
+
+    def add(self, child):
+        key = self._key(child)
+        existing = self._children.get(key)
+
+        if existing is None:
+            self._children[key] = child
+        elif isinstance(existing, list):
+            existing.append(child)
+        else:
+            self._children[key] = [existing, child]
+
+    def remove(self, child):
+        key = self._key(child)
+        existing = self._children.get(key)
+
+        if isinstance(existing, list):
+            children = [c for c in existing if c is not child]
+            self._children[key] = children if len(children) > 1 else children[0]
+        elif existing is child:
+            del self._children[key]
+
+    def get(self, key):
+        existing = self._children.get(key)
+        if isinstance(existing, list):
+            return existing[0]
+
+        return existing
+
+
+BY_ID = attrgetter('id')
+BY_SLUG = attrgetter('slug')
+
+
 class Document(object, metaclass=ABCMeta):
-    _id = None
-    _name = None
-    _source = None
+    # Many documents are loaded at once in bulk operations, so they keep no __dict__
+    __slots__ = ('_id', '_name', '_source', '__weakref__')
 
     @classmethod
     def from_source(cls, source):
@@ -88,6 +187,7 @@ class Document(object, metaclass=ABCMeta):
 
 
 class Dashboard(Document):
+    __slots__ = ('_rows', '_rows_by_slug', '_panel_ids', '_dirty')
 
     def __init__(self, source, id):
         self._id = id
@@ -97,10 +197,21 @@ class Dashboard(Document):
     def _load(self, source):
         self._source = source
 
+        # Rows are built once navigated, so operations on whole dashboards
+        # (backup, cp, export) pass the source through untouched
+        self._rows = None
+        self._rows_by_slug = None
+        self._panel_ids = None
+        self._dirty = False
+
+    def _load_rows(self):
         self._rows = []
-        for row in source['rows']:
+        self._panel_ids = PanelIds()
+        for row in self._source['rows']:
             self._add_row(row)
 
+        self._dirty = False
+
     def update(self, document):
         if isinstance(document, Dashboard):
             self._load(document.source.copy())
@@ -113,35 +224,62 @@ class Dashboard(Document):
                                           document.__class__.__name__))
 
     def remove_child(self, name):
-        id = self._get_row_id(name)
-        del self._rows[id-1]
+        row = self.row(name)
+        index = self._row_index(row)
+        del self._rows[index]
+        self._rows_by_slug = None
+        self._dirty = True
+
+        for panel in row.panels:
+            self._panel_ids.remove(panel.id)
+
+        self._refresh_rows_id(index, len(self._rows))
 
     def move_child(self, name, position):
         child = self.row(name)
-        index = relative_index(self._rows.index(child), position)
+        old_index = self._row_index(child)
+        index = relative_index(old_index, position)
 
-        self._rows.remove(child)
+        del self._rows[old_index]
+        index = insert_index(index, len(self._rows))
         self._rows.insert(index, child)
+        self._dirty = True
 
-        self._refresh_rows_id()
+        self._refresh_rows_id(min(old_index, index), max(old_index, index)+1)
 
     def _add_row(self, source):
-        max_id = len(self._rows)
+        max_id = len(self.rows)
         row = Row(source, max_id+1, self)
         self._rows.append(row)
+        self._rows_by_slug = None
+        self._dirty = True
         return row
 
-    def _refresh_rows_id(self):
-        for i, row in enumerate(self._rows):
-            row.set_id(i+1)
+    def _refresh_rows_id(self, start, end):
+        for i in range(start, end):
+            self._rows[i].set_id(i+1)
+
+    def _row_index(self, row):
+        # Row ids follow positions, unless the row was replaced by update()
+        index = row.id - 1
+        if 0 <= index < len(self._rows) and self._rows[index] is row:
+            return index
+
+        return self._rows.index(row)
 
     def row(self, name):
+        if not ID_PATTERN.search(name):
+            if self._rows_by_slug is None:
+                self._rows_by_slug = ChildIndex(BY_SLUG, self.rows)
+
+            return find_child(self._rows_by_slug, name, "row")
+
         id = self._get_row_id(name)
         return self._rows[id-1]
 
     def _get_row_id(self, name):
         id = get_id(name)
-        if id <= 0 or len(self._rows) < id:
+        if id <= 0 or len(self.rows) < id:
             raise DocumentNotFound("There is no row at index {}".format(id))
 
         return id
@@ -158,32 +296,63 @@ class Dashboard(Document):
 
     @property
     def rows(self):
+        if self._rows is None:
+            self._load_rows()
+
         return self._rows
 
     @property
     def source(self):
-        self._source['rows'] = [row.source for row in self._rows]
+        # Reassembled only after the tree was changed
+        if self._dirty:
+            self._source['rows'] = [row.source for row in self._rows]
+            self._dirty = False
+
         return self._source
 
 
 class Row(Document):
+    __slots__ = ('_dashboard', '_panel_ids', '_panels', '_panels_by_id', '_panels_by_slug', '_dirty')
+
     def __init__(self, source, id=0, dashboard=None):
-        self._dashboard = dashboard
+        # Weak, so that document trees hold no reference cycles
+        if dashboard:
+            self._dashboard = weakref.ref(dashboard)
+            self._panel_ids = dashboard._panel_ids
+        else:
+            self._dashboard = None
+            self._panel_ids = PanelIds()
+
+        self._panels = []
+        self._panels_by_id = ChildIndex(BY_ID)
+        # Built on first lookup by name, since slugs are costly to compute
+        self._panels_by_slug = None
         self._load(source, id)
 
     def _load(self, source, id):
         self._id = id
         self._source = source
-        self._set_name(id)
+        self._name = None
+
+        for panel in self._panels:
+            self._panel_ids.remove(panel.id)
+            self._panels_by_id.remove(panel)
 
         self._panels = []
+        self._panels_by_slug = None
         for panel in source['panels']:
             self._add_panel(panel, keep_id=True)
 
+        self._dirty = False
+
     def update(self, document):
         if isinstance(document, Row):
             self._load(document.source.copy(), document.id)
             self.update_panel_ids()
+            self._set_dirty()
+
+            if self.parent:
+                self.parent._rows_by_slug = None
         elif isinstance(document, Panel):
             self._add_panel(document.source, keep_id=False)
         else:
@@ -192,60 +361,79 @@ class Row(Document):
                                           document.__class__.__name__))
 
     def remove_child(self, name):
-        self._panels.remove(self.panel(name))
+        panel = self.panel(name)
+        self._panels.remove(panel)
+        self._panel_ids.remove(panel.id)
+        self._panels_by_id.remove(panel)
+        self._panels_by_slug = None
+        self._set_dirty()
 
     def move_child(self, name, position):
         child = self.panel(name)
-        index = relative_index(self._panels.index(child), position)
+        old_index = self._panels.index(child)
+        index = relative_index(old_index, position)
 
-        self._panels.remove(child)
+        del self._panels[old_index]
         self._panels.insert(index, child)
+        self._set_dirty()
 
     def set_id(self, id):
         self._id = id
         self._source['id'] = id
-        self._set_name(id)
+        self._name = None
 
-    def _set_name(self, id):
-        title = slug(self.title)
+    @property
+    def name(self):
+        # Computed on first use, slugs of all titles are rarely needed
+        if self._name is None:
+            if self._id:
+                self._name = "{}-{}".format(self._id, self.slug)
+            else:
+                self._name = self.slug
 
-        if id:
-            self._name = "{}-{}".format(self._id, title)
-        else:
-            self._name = title
+        return self._name
 
     def _add_panel(self, source, keep_id):
         if keep_id:
             id = source['id']
-        elif self._dashboard:
-            id = self._dashboard.max_panel_id() + 1
+            self._panel_ids.add(id)
         else:
-            id = self.max_panel_id() + 1
+            id = self._panel_ids.allocate()
 
         panel = Panel(source, id, self)
         self._panels.append(panel)
+        self._panels_by_id.add(panel)
+        self._panels_by_slug = None
+        self._set_dirty()
+
+    def _set_dirty(self):
+        self._dirty = True
+        if self.parent:
+            self.parent._dirty = True
 
     def update_panel_ids(self):
         for panel in self._panels:
-            panel.set_id(0)
+            self._panel_ids.remove(panel.id)
+            self._panels_by_id.remove(panel)
 
         for panel in self._panels:
-            if self._dashboard:
-                max_id = self._dashboard.max_panel_id()
-            else:
-                max_id = self.max_panel_id()
-
-            panel.set_id(max_id + 1)
+            panel.set_id(self._panel_ids.allocate())
+            self._panels_by_id.add(panel)
 
     def panel(self, name):
+        if not ID_PATTERN.search(name):
+            if self._panels_by_slug is None:
+                self._panels_by_slug = ChildIndex(BY_SLUG, self._panels)
+
+            return find_child(self._panels_by_slug, name, "panel")
+
         id = get_id(name)
-        panels = [p for p in self._panels
-                  if p.id == id]
+        panel = self._panels_by_id.get(id)
 
-        if not panels:
+        if not panel:
             raise DocumentNotFound("There is no panel with id {}".format(id))
 
-        return panels[0]
+        return panel
 
     def max_panel_id(self):
         if self.panels:
@@ -260,32 +448,50 @@ class Row(Document):
 
     @property
     def source(self):
-        self._source['panels'] = [panel.source for panel in self._panels]
+        if self._dirty:
+            self._source['panels'] = [panel.source for panel in self._panels]
+            self._dirty = False
+
         return self._source
 
     @property
     def parent(self):
-        return self._dashboard
+        return self._dashboard() if self._dashboard else None
 
 
 class Panel(Document):
+    __slots__ = ('_row',)
+
     def __init__(self, source, id=0, row=None):
         self._id = id
-        self._row = row
+        self._row = weakref.ref(row) if row else None
         self._load(source)
 
     def _load(self, source):
         source['id'] = self._id
         self._source = source
-        self._name = "{}-{}".format(self._id, slug(self.title))
+        self._name = None
 
     def set_id(self, id):
         self._id = id
         self._source['id'] = id
+        self._name = None
+
+    @property
+    def name(self):
+        if self._name is None:
+            self._name = "{}-{}".format(self._id, self.slug)
+
+        return self._name
 
     def update(self, document):
         if isinstance(document, Panel):
             self._load(document.source.copy())
+
+            row = self.parent
+            if row:
+                row._panels_by_slug = None
+                row._set_dirty()
         else:
             raise InvalidDocument("Can not update {} with {}"
                                   .format(self.__class__.__name__,
@@ -293,7 +499,7 @@ class Panel(Document):
 
     @property
     def parent(self):
-        return self._row
+        return self._row() if self._row else None
 
     def remove_child(self, name):
         raise InvalidDocument("Panel has no child nodes")
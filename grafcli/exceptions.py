@@ -1,6 +1,10 @@
 from climb.exceptions import CLIException
 
 
+class ConfigError(CLIException):
+    pass
+
+
 class HostConfigError(CLIException):
     pass
 
@@ -13,6 +17,10 @@ class MissingTemplateCategory(CLIException):
     pass
 
 
+class MissingSnapshotName(CLIException):
+    pass
+
+
 class InvalidPath(CLIException):
     pass
 
@@ -27,3 +35,7 @@ class DocumentNotFound(CLIException):
 
 class CommandCancelled(CLIException):
     pass
+
+
+class StorageError(CLIException):
+    pass
@@ -0,0 +1,84 @@
+import copy
+
+
+def diff(old, new, path=''):
+    """Returns JSON patch (RFC 6902) operations turning old document into new one."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = []
+        for key in old:
+            key_path = "{}/{}".format(path, escape(key))
+            if key in new:
+                operations.extend(diff(old[key], new[key], key_path))
+            else:
+                operations.append({'op': 'remove', 'path': key_path})
+
+        for key in new:
+            if key not in old:
+                operations.append({'op': 'add',
+                                   'path': "{}/{}".format(path, escape(key)),
+                                   'value': new[key]})
+
+        return operations
+
+    if isinstance(old, list) and isinstance(new, list):
+        operations = []
+        common = min(len(old), len(new))
+
+        for i in range(common):
+            operations.extend(diff(old[i], new[i], "{}/{}".format(path, i)))
+
+        for i in range(common, len(new)):
+            operations.append({'op': 'add',
+                               'path': "{}/{}".format(path, i),
+                               'value': new[i]})
+
+        # Remove from the end, so indexes of remaining items do not shift
+        for i in reversed(range(common, len(old))):
+            operations.append({'op': 'remove', 'path': "{}/{}".format(path, i)})
+
+        return operations
+
+    if type(old) == type(new) and old == new:
+        return []
+
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+def apply(document, operations):
+    """Returns copy of document with add, remove and replace operations applied."""
+    document = copy.deepcopy(document)
+
+    for operation in operations:
+        value = copy.deepcopy(operation.get('value'))
+        keys = [unescape(key) for key in operation['path'].split('/')[1:]]
+
+        if not keys:
+            document = value
+            continue
+
+        parent = document
+        for key in keys[:-1]:
+            parent = parent[int(key)] if isinstance(parent, list) else parent[key]
+
+        key = keys[-1]
+        if isinstance(parent, list):
+            key = len(parent) if key == '-' else int(key)
+
+        if operation['op'] == 'remove':
+            del parent[key]
+        elif operation['op'] == 'add' and isinstance(parent, list):
+            parent.insert(key, value)
+        elif operation['op'] in ('add', 'replace'):
+            parent[key] = value
+        else:
+            raise ValueError("Unsupported patch operation: {}".format(operation['op']))
+
+    return document
+
+
+def escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def unescape(key):
+    return key.replace('~1', '/').replace('~0', '~')
@@ -0,0 +1,63 @@
+import time
+import threading
+from collections import OrderedDict
+from climb.config import config
+
+from grafcli.utils import json_dumps, json_loads
+
+DEFAULT_TTL = 10.0
+DEFAULT_SIZE = 100
+
+
+class DocumentCache(object):
+    """LRU cache of dashboard sources, with entries expiring after ttl seconds.
+
+    Sources are kept serialized, since callers modify documents in place
+    and parsing is cheaper than a deep copy.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, size=DEFAULT_SIZE):
+        self._ttl = ttl
+        self._size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        """Returns cache configured in resources section, or None if disabled."""
+        resources = config['resources']
+        if not resources.getboolean('cache', True):
+            return None
+
+        return cls(resources.getfloat('cache-ttl', DEFAULT_TTL),
+                   resources.getint('cache-size', DEFAULT_SIZE))
+
+    def get(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+
+            expires, content = entry
+            if expires < time.monotonic():
+                del self._entries[name]
+                return None
+
+            self._entries.move_to_end(name)
+
+        return json_loads(content)
+
+    def put(self, name, source):
+        entry = (time.monotonic() + self._ttl, json_dumps(source))
+
+        with self._lock:
+            self._entries[name] = entry
+            self._entries.move_to_end(name)
+
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *names):
+        with self._lock:
+            for name in names:
+                self._entries.pop(name, None)
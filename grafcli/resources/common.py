@@ -1,16 +1,24 @@
+from climb.config import config
+
 from grafcli.documents import Dashboard
-from grafcli.exceptions import InvalidPath, DocumentNotFound, InvalidDocument
+from grafcli.exceptions import InvalidPath, DocumentNotFound, InvalidDocument, CommandCancelled
 from grafcli.utils import confirm_prompt
 
 
 class CommonResources(object):
     _storage = None
+    _cache = None
+    _index = None
 
     def list(self, dashboard_name=None, row_name=None, panel_name=None):
         if not dashboard_name:
+            # Good enough for navigation and completion, see list_dashboards()
+            if self._index:
+                return self._index.list()
+
             return self._storage.list()
 
-        dashboard = self.get(dashboard_name)
+        dashboard = self._get_dashboard(dashboard_name)
 
         if not row_name:
             return [row.name for row in dashboard.rows]
@@ -26,33 +34,45 @@ class CommonResources(object):
         else:
             return panels
 
+    def list_dashboards(self):
+        """Lists dashboards from storage, for commands acting on all of them."""
+        return self._storage.list()
+
+    def list_metadata(self):
+        return self._storage.list_metadata()
+
     def get(self, dashboard_name=None, row_name=None, panel_name=None):
         if not dashboard_name:
             raise InvalidPath("Provide the dashboard at least")
 
-        dashboard = self._storage.get(dashboard_name)
-
         if not row_name:
-            return dashboard
+            # Whole dashboards are read by cat, export and bulk commands, which
+            # do not read them again, the cache serves navigation and completion
+            return self._storage.get(dashboard_name)
 
-        if not panel_name:
-            return dashboard.row(row_name)
+        dashboard = self._get_dashboard(dashboard_name)
+        return self._get_child(dashboard, row_name, panel_name)
 
-        return dashboard.row(row_name).panel(panel_name)
+    def get_many(self, dashboard_names):
+        return self._storage.get_many(dashboard_names)
 
     def save(self, document, dashboard_name=None, row_name=None, panel_name=None):
-        if dashboard_name:
+        if (dashboard_name and not row_name and isinstance(document, Dashboard) and
+                config['grafcli'].getboolean('force')):
+            # Replaced as a whole without asking, nothing to fetch first
+            dashboard = document
+            dashboard.set_id(dashboard_name)
+        elif dashboard_name:
             try:
-                origin_document = self.get(dashboard_name, row_name, panel_name)
+                # Documents link to parents weakly, so the dashboard is kept here.
+                # Writes start from a fresh copy, never a cached one, not to undo remote changes.
+                dashboard = self._storage.get(dashboard_name)
+                origin_document = self._get_child(dashboard, row_name, panel_name)
 
                 if type(document) == type(origin_document):
                     confirm_prompt("Overwrite {}?".format(origin_document.name))
 
                 origin_document.update(document)
-
-                dashboard = origin_document
-                while dashboard.parent:
-                    dashboard = dashboard.parent
             except DocumentNotFound:
                 if not isinstance(document, Dashboard):
                     raise
@@ -67,13 +87,50 @@ class CommonResources(object):
                                   .format(type(document).__name__))
 
         self._storage.save(dashboard.id, dashboard)
+        self._invalidate(dashboard_name, dashboard.id)
+
+    def save_many(self, documents):
+        """Saves whole dashboards given as (name, dashboard) pairs in one batch.
+
+        Returns names of dashboards not overwritten, as declined at the prompt.
+        """
+        if config['grafcli'].getboolean('force'):
+            existing = set()
+        else:
+            existing = set(self._storage.list())
+
+        dashboards = []
+        skipped = []
+        for dashboard_name, document in documents:
+            if not isinstance(document, Dashboard):
+                raise InvalidDocument("Can not save {} as dashboard"
+                                      .format(type(document).__name__))
+
+            if dashboard_name in existing:
+                try:
+                    confirm_prompt("Overwrite {}?".format(dashboard_name))
+                except CommandCancelled:
+                    skipped.append(dashboard_name)
+                    continue
+
+            document.set_id(dashboard_name)
+            dashboards.append((dashboard_name, document))
+
+        self._storage.save_many(dashboards)
+        self._invalidate(*[dashboard_name for dashboard_name, _ in dashboards])
+
+        return skipped
+
+    @property
+    def batch_size(self):
+        return self._storage.batch_size
 
     def remove(self, dashboard_name=None, row_name=None, panel_name=None):
         if not dashboard_name:
             raise InvalidPath("Provide the dashboard at least")
 
         if row_name:
-            dashboard = self.get(dashboard_name)
+            dashboard = self._storage.get(dashboard_name)
 
             if panel_name:
                 dashboard.row(row_name).remove_child(panel_name)
@@ -83,3 +140,39 @@ class CommonResources(object):
             self._storage.save(dashboard.id, dashboard)
         else:
             self._storage.remove(dashboard_name)
+
+        self._invalidate(dashboard_name)
+
+    def collect_garbage(self):
+        if not hasattr(self._storage, 'collect_garbage'):
+            raise InvalidPath("Storage does not support garbage collection")
+
+        return self._storage.collect_garbage()
+
+    def _get_child(self, dashboard, row_name=None, panel_name=None):
+        if not row_name:
+            return dashboard
+
+        if not panel_name:
+            return dashboard.row(row_name)
+
+        return dashboard.row(row_name).panel(panel_name)
+
+    def _get_dashboard(self, dashboard_name):
+        if not self._cache:
+            return self._storage.get(dashboard_name)
+
+        source = self._cache.get(dashboard_name)
+        if source is not None:
+            return Dashboard(source, dashboard_name)
+
+        dashboard = self._storage.get(dashboard_name)
+        self._cache.put(dashboard_name, dashboard.source)
+        return dashboard
+
+    def _invalidate(self, *dashboard_names):
+        if self._cache:
+            self._cache.invalidate(*dashboard_names)
+
+        if self._index:
+            self._index.invalidate()
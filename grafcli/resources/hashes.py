@@ -0,0 +1,61 @@
+from urllib.parse import quote
+
+from grafcli.exceptions import DocumentNotFound
+from grafcli.storage.system import read_file, write_file, makepath
+
+HASHES_DIR = 'sync'
+
+
+def listed_version(entry):
+    """Returns what identifies content of a listed dashboard, or None if listing tells nothing."""
+    version = [entry.get('version'), entry.get('updated')]
+    if version == [None, None]:
+        return None
+
+    return version
+
+
+class ContentHashes(object):
+    """Content hashes and ids of dashboards under a path, kept in data-dir between runs.
+
+    Each hash is stored with the version listed when it was computed,
+    so it is reused until storage lists another version.
+    """
+
+    def __init__(self, path):
+        self._name = quote(path, safe='')
+        self._records = self._load()
+
+    def outdated(self, entries):
+        """Returns names of listed dashboards with no hash stored for their version."""
+        return [entry['slug'] for entry in entries
+                if listed_version(entry) is None or
+                self._records.get(entry['slug'], {}).get('version') != listed_version(entry)]
+
+    def get(self, name):
+        return self._records[name]
+
+    def put(self, entry, content_hash, dashboard_id):
+        self._records[entry['slug']] = {
+            'version': listed_version(entry),
+            'hash': content_hash,
+            'id': dashboard_id,
+        }
+
+    def discard(self, *names):
+        for name in names:
+            self._records.pop(name, None)
+
+    def save(self):
+        # Hashes of unversioned dashboards are good for this run only
+        records = {name: record for name, record in self._records.items()
+                   if record['version'] is not None}
+
+        makepath(HASHES_DIR)
+        write_file(HASHES_DIR, self._name, records)
+
+    def _load(self):
+        try:
+            return read_file(HASHES_DIR, self._name)
+        except (DocumentNotFound, ValueError):
+            return {}
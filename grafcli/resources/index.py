@@ -0,0 +1,69 @@
+import time
+import threading
+from climb.config import config
+
+from grafcli.exceptions import DocumentNotFound
+from grafcli.storage.system import read_file, write_file, remove_file, makepath
+
+INDEX_DIR = 'index'
+DEFAULT_TTL = 60.0
+
+
+class ListingIndex(object):
+    """Dashboards metadata of a remote host, kept in data-dir between runs."""
+
+    def __init__(self, host, storage, ttl=DEFAULT_TTL):
+        self._host = host
+        self._storage = storage
+        self._ttl = ttl
+        self._data = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, host, storage):
+        """Returns index configured in resources section, or None if disabled."""
+        ttl = config['resources'].getfloat('index-ttl', DEFAULT_TTL)
+        if ttl <= 0:
+            return None
+
+        return cls(host, storage, ttl)
+
+    def list(self):
+        return [entry['slug'] for entry in self.entries()]
+
+    def entries(self):
+        with self._lock:
+            if self._data is None:
+                self._data = self._load()
+
+            if self._data is None or self._data['refreshed'] + self._ttl < time.time():
+                self._data = self._refresh()
+
+            return self._data['dashboards']
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+
+            try:
+                remove_file(INDEX_DIR, self._host)
+            except DocumentNotFound:
+                pass
+
+    def _load(self):
+        try:
+            return read_file(INDEX_DIR, self._host)
+        except (DocumentNotFound, ValueError):
+            return None
+
+    def _refresh(self):
+        # Metadata queries never fetch dashboards' content
+        data = {
+            'refreshed': time.time(),
+            'dashboards': self._storage.list_metadata(),
+        }
+
+        makepath(INDEX_DIR)
+        write_file(INDEX_DIR, self._host, data)
+
+        return data
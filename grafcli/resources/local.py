@@ -1,7 +1,7 @@
-from grafcli.storage.system import SystemStorage
+from grafcli.storage import get_local_storage
 from grafcli.resources.common import CommonResources
 
 
 class LocalResources(CommonResources):
     def __init__(self, local_dir):
-        self._storage = SystemStorage(local_dir)
+        self._storage = get_local_storage(local_dir)
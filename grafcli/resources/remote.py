@@ -1,8 +1,12 @@
 from grafcli.storage import get_remote_storage
+from grafcli.resources.cache import DocumentCache
 from grafcli.resources.common import CommonResources
+from grafcli.resources.index import ListingIndex
 
 
 class RemoteResources(CommonResources):
 
     def __init__(self, host):
         self._storage = get_remote_storage(host)
+        self._cache = DocumentCache.from_config()
+        self._index = ListingIndex.from_config(host, self._storage)
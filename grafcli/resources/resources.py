@@ -1,10 +1,13 @@
+import threading
 from climb.config import config
 from climb.paths import split_path
 
-from grafcli.exceptions import InvalidPath, MissingHostName, MissingTemplateCategory
+from grafcli.exceptions import InvalidPath, MissingHostName, MissingTemplateCategory, MissingSnapshotName
 from grafcli.resources.remote import RemoteResources
-from grafcli.resources.templates import DashboardsTemplates, RowsTemplates, PanelTemplates, CATEGORIES
+from grafcli.resources.snapshots import SnapshotHistory, SnapshotResources
+from grafcli.resources.templates import TEMPLATE_TYPES, CATEGORIES
 from grafcli.resources.local import LocalResources
+from grafcli.storage.snapshots import SnapshotStore, list_snapshot_stores
 
 LOCAL_DIR = 'backups'
 
@@ -12,14 +15,13 @@ LOCAL_DIR = 'backups'
 class Resources(object):
 
     def __init__(self):
+        self._managers_lock = threading.Lock()
         self._resources = {
             'backups': LocalResources(LOCAL_DIR),
             'remote': {},
-            'templates': {
-                'dashboards': DashboardsTemplates(),
-                'rows': RowsTemplates(),
-                'panels': PanelTemplates(),
-            },
+            'snapshots': {},
+            # Created on first access, since they may write default templates
+            'templates': {},
         }
 
     def list(self, path):
@@ -31,12 +33,22 @@ class Resources(object):
                     if config.getboolean('hosts', host)]
         except MissingTemplateCategory:
             return CATEGORIES
+        except MissingSnapshotName:
+            return list_snapshot_stores()
 
         if not manager and not parts:
             return sorted(self._resources.keys())
 
         return manager.list(*parts)
 
+    def list_dashboards(self, path):
+        """Returns up to date list of dashboards under given path, bypassing the listing index."""
+        return self._batch_manager(path).list_dashboards()
+
+    def list_metadata(self, path):
+        """Returns slug, and version or updated time if known, of every dashboard under given path."""
+        return self._batch_manager(path).list_metadata()
+
     def get(self, path):
         """Returns resource data."""
         manager, parts = self._parse_path(path)
@@ -45,11 +57,45 @@ class Resources(object):
 
         return manager.get(*parts)
 
+    def get_many(self, path, names):
+        """Returns dashboards with given names from under given path."""
+        return self._batch_manager(path).get_many(names)
+
     def save(self, path, document):
         """Returns resource data."""
         manager, parts = self._parse_path(path)
         return manager.save(document, *parts)
 
+    def save_many(self, path, documents):
+        """Saves (name, dashboard) pairs as dashboards under given path, returns names skipped."""
+        return self._batch_manager(path).save_many(documents)
+
+    def batch_size(self, path):
+        """Returns number of dashboards saved together under given path by default."""
+        return self._batch_manager(path).batch_size
+
+    def collect_garbage(self, path):
+        """Removes data no longer referenced by dashboards under given path."""
+        manager = self._batch_manager(path)
+        if not hasattr(manager, 'collect_garbage'):
+            raise InvalidPath("Garbage collection is not supported for {}".format(path))
+
+        return manager.collect_garbage()
+
+    def create_snapshot(self, name, dashboards):
+        """Stores dashboards, given by name, as new snapshot and returns its id."""
+        return SnapshotStore(name).create({dashboard_name: dashboard.source
+                                           for dashboard_name, dashboard in dashboards.items()})
+
+    def supports_batch(self, path):
+        """Checks if dashboards under given path can be read and saved in batches."""
+        try:
+            self._batch_manager(path)
+        except (InvalidPath, MissingHostName, MissingTemplateCategory):
+            return False
+
+        return True
+
     def remove(self, path):
         """Removes resource."""
         manager, parts = self._parse_path(path)
@@ -58,6 +104,13 @@ class Resources(object):
 
         return manager.remove(*parts)
 
+    def _batch_manager(self, path):
+        manager, parts = self._parse_path(path)
+        if parts or not hasattr(manager, 'save_many'):
+            raise InvalidPath("Batch operations are supported only for dashboards")
+
+        return manager
+
     def _parse_path(self, path):
         parts = split_path(path)
 
@@ -70,18 +123,32 @@ class Resources(object):
                 raise MissingHostName("Provide remote host name")
 
             host = parts.pop(0)
-            if host not in self._resources['remote']:
-                self._resources['remote'][host] = RemoteResources(host)
+            with self._managers_lock:
+                if host not in self._resources['remote']:
+                    self._resources['remote'][host] = RemoteResources(host)
 
             manager = self._resources['remote'][host]
+        elif resource == 'snapshots':
+            if not parts:
+                raise MissingSnapshotName("Provide snapshots name")
+
+            store = SnapshotStore(parts.pop(0))
+            if not parts:
+                return SnapshotHistory(store), []
+
+            manager = SnapshotResources(store, parts.pop(0))
         elif resource == 'templates':
             if not parts:
                 raise MissingTemplateCategory("Provide template category")
 
             category = parts.pop(0)
-            if category not in self._resources['templates']:
+            if category not in TEMPLATE_TYPES:
                 raise InvalidPath("Invalid template category: {}".format(category))
 
+            with self._managers_lock:
+                if category not in self._resources['templates']:
+                    self._resources['templates'][category] = TEMPLATE_TYPES[category]()
+
             manager = self._resources['templates'][category]
         else:
             try:
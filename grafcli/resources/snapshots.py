@@ -0,0 +1,25 @@
+from grafcli.exceptions import InvalidPath
+from grafcli.resources.common import CommonResources
+from grafcli.storage.snapshots import SnapshotStorage
+
+
+class SnapshotHistory(object):
+    def __init__(self, store):
+        self._store = store
+
+    def list(self):
+        return self._store.list()
+
+    def get(self, *parts):
+        raise InvalidPath("Provide snapshot id")
+
+    def save(self, document, *parts):
+        raise InvalidPath("Snapshots can be created only with snapshot command")
+
+    def remove(self, *parts):
+        raise InvalidPath("Provide snapshot id")
+
+
+class SnapshotResources(CommonResources):
+    def __init__(self, store, snapshot_id):
+        self._storage = SnapshotStorage(store, snapshot_id)
@@ -42,6 +42,22 @@ class DashboardsTemplates(CommonTemplates):
     def save(self, document, dashboard_name=None, row_name=None, panel_name=None):
         return self._resources.save(document, dashboard_name, row_name, panel_name)
 
+    def list_dashboards(self):
+        return self._resources.list_dashboards()
+
+    def list_metadata(self):
+        return self._resources.list_metadata()
+
+    def get_many(self, dashboard_names):
+        return self._resources.get_many(dashboard_names)
+
+    def save_many(self, documents):
+        return self._resources.save_many(documents)
+
+    @property
+    def batch_size(self):
+        return self._resources.batch_size
+
 
 class RowsTemplates(CommonTemplates):
     _base_dir = ROWS_DIR
@@ -106,3 +122,10 @@ class PanelTemplates(CommonTemplates):
 
     def remove(self, panel_name=None):
         return self._resources.remove(DEFAULT, DEFAULT_ROW, panel_name)
+
+
+TEMPLATE_TYPES = {
+    DASHBOARDS: DashboardsTemplates,
+    ROWS: RowsTemplates,
+    PANELS: PanelTemplates,
+}
@@ -1,21 +1,30 @@
+import importlib
 from climb.config import config
 
 from grafcli.exceptions import HostConfigError
 from grafcli.storage.storage import Storage
-from grafcli.storage.elastic import ElasticStorage
-from grafcli.storage.sql import MySQLStorage, PostgreSQLStorage, SQLiteStorage
-from grafcli.storage.api import APIStorage
-
 
+# Backends are imported only when a host of given type is used,
+# so short commands do not pay for drivers they never touch.
 STORAGE_TYPES = {
-    'elastic': ElasticStorage,
-    'mysql': MySQLStorage,
-    'postgresql': PostgreSQLStorage,
-    'sqlite': SQLiteStorage,
-    'api': APIStorage,
+    'elastic': 'grafcli.storage.elastic:ElasticStorage',
+    'mysql': 'grafcli.storage.sql:MySQLStorage',
+    'postgresql': 'grafcli.storage.sql:PostgreSQLStorage',
+    'sqlite': 'grafcli.storage.sql:SQLiteStorage',
+    'api': 'grafcli.storage.api:APIStorage',
+}
+
+LOCAL_STORAGE_TYPES = {
+    'files': 'grafcli.storage.system:SystemStorage',
+    'content': 'grafcli.storage.content:ContentStorage',
 }
 
 
+def load_storage_class(path):
+    module_name, class_name = path.split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
 def get_remote_storage(host):
     if host not in config['hosts']:
         raise HostConfigError("No such host defined: {}".format(host))
@@ -30,5 +39,14 @@ def get_remote_storage(host):
     if storage_type not in STORAGE_TYPES:
         raise HostConfigError("Unknown storage type: {}".format(storage_type))
 
-    storage_class = STORAGE_TYPES[storage_type]
+    storage_class = load_storage_class(STORAGE_TYPES[storage_type])
     return storage_class(host)
+
+
+def get_local_storage(base_dir):
+    layout = config['resources'].get('layout', 'files')
+    if layout not in LOCAL_STORAGE_TYPES:
+        raise HostConfigError("Unknown local storage layout: {}".format(layout))
+
+    storage_class = load_storage_class(LOCAL_STORAGE_TYPES[layout])
+    return storage_class(base_dir)
@@ -1,10 +1,27 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from climb.config import config
 
 from grafcli.storage import Storage
 from grafcli.documents import Dashboard
 from grafcli.exceptions import DocumentNotFound
+from grafcli.utils import json_dumps, json_loads
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 30.0
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Status returned by Grafana when saving with overwrite off (key False)
+# hits an existing dashboard, or with overwrite on (key True) an id unknown
+# to the host, e.g. of a missing dashboard or one copied from another host
+WRONG_GUESS_STATUS = {
+    False: 412,
+    True: 404,
+}
 
 
 class APIStorage(Storage):
@@ -12,58 +29,113 @@ class APIStorage(Storage):
     def __init__(self, host):
         super().__init__(host)
         self._config = config[host]
+        self._session = None
+        # Whether dashboards exist, by slug, as learned from listings, reads and writes
+        self._exists = {}
+        self._timeout = self._config.getfloat('timeout', DEFAULT_TIMEOUT)
 
-    def _call(self, method, url, data=None):
-        full_url = os.path.join(self._config['url'], url)
-        auth = None
-        headers = {}
+    @property
+    def session(self):
+        if not self._session:
+            self._session = self._create_session()
+
+        return self._session
+
+    def _create_session(self):
+        session = requests.Session()
 
-        api_token = os.getenv('GRAFANA_API_TOKEN');
+        api_token = os.getenv('GRAFANA_API_TOKEN')
         if api_token:
-            headers['Authorization'] = 'Bearer {}'.format(api_token)
+            session.headers['Authorization'] = 'Bearer {}'.format(api_token)
         elif self._config.get('token'):
-            headers['Authorization'] = 'Bearer {}'.format(self._config['token'])
+            session.headers['Authorization'] = 'Bearer {}'.format(self._config['token'])
         else:
-            auth = (self._config['user'], self._config['password'])
+            session.auth = (self._config['user'], self._config['password'])
+
+        pool_size = self._config.getint('pool-size', DEFAULT_POOL_SIZE)
+        retries = Retry(total=self._config.getint('retries', DEFAULT_RETRIES),
+                        backoff_factor=self._config.getfloat('retry-backoff', DEFAULT_BACKOFF),
+                        status_forcelist=RETRY_STATUSES,
+                        raise_on_status=False)
+
+        adapter = HTTPAdapter(pool_connections=1,
+                              pool_maxsize=pool_size,
+                              max_retries=retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        return session
+
+    def _call(self, method, url, data=None):
+        full_url = os.path.join(self._config['url'], url)
 
-        response = requests.request(method, full_url,
-                                    headers=headers,
-                                    auth=auth,
-                                    json=data)
+        headers = {}
+        if data is not None:
+            # Bytes, since requests would encode a str body as Latin-1
+            data = json_dumps(data).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        response = self.session.request(method, full_url,
+                                        data=data,
+                                        headers=headers,
+                                        timeout=self._timeout)
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
 
     def list(self):
-        return [row['uri'].split('/')[-1]
-                for row in self._call('GET', 'search')]
+        return [entry['slug'] for entry in self.list_metadata()]
+
+    def list_metadata(self):
+        entries = [{'slug': row['uri'].split('/')[-1],
+                    'title': row.get('title')}
+                   for row in self._call('GET', 'search')]
+
+        self._exists = dict.fromkeys((entry['slug'] for entry in entries), True)
+        return entries
 
     def get(self, dashboard_id):
         try:
             source = self._call('GET', 'dashboards/db/{}'.format(dashboard_id))
         except requests.HTTPError as exc:
             if exc.response.status_code == 404:
+                self._exists[dashboard_id] = False
                 raise DocumentNotFound("There is no such dashboard: {}".format(dashboard_id))
 
             raise
+
+        self._exists[dashboard_id] = True
         return Dashboard(source['dashboard'], dashboard_id)
 
     def save(self, dashboard_id, dashboard):
         if not dashboard_id:
             dashboard_id = dashboard.slug
 
-        data = {
-            "dashboard": dashboard.source,
-        }
+        # Guess whether the dashboard exists from what is already known instead
+        # of fetching it first, and fall back if the server rejects the guess.
+        overwrite = self._exists.get(dashboard_id, False)
 
         try:
-            self._call('GET', 'dashboards/db/{}'.format(dashboard_id))
-            data["overwrite"] = True
+            self._post(dashboard.source, overwrite, keep_id=overwrite)
         except requests.HTTPError as exc:
-            if exc.response.status_code != 404:
+            if exc.response.status_code != WRONG_GUESS_STATUS[overwrite]:
                 raise
-            data["dashboard"]["id"] = None
+
+            # Let Grafana match the dashboard by uid or title instead of the id
+            self._post(dashboard.source, True, keep_id=False)
+
+        self._exists[dashboard_id] = True
+
+    def _post(self, source, overwrite, keep_id):
+        if not keep_id:
+            source = dict(source, id=None)
+
+        data = {
+            "dashboard": source,
+            "overwrite": overwrite,
+        }
 
         self._call('POST', 'dashboards/db', data)
 
     def remove(self, dashboard_id):
         self._call('DELETE', 'dashboards/db/{}'.format(dashboard_id))
+        self._exists[dashboard_id] = False
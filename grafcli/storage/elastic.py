@@ -1,16 +1,14 @@
-import json
 import warnings
 from climb.config import config
 
 from grafcli.documents import Dashboard
-from grafcli.exceptions import DocumentNotFound
+from grafcli.exceptions import DocumentNotFound, StorageError
 from grafcli.storage import Storage
-from grafcli.utils import try_import
-
-Elasticsearch = getattr(try_import('elasticsearch'), 'Elasticsearch', None)
+from grafcli.utils import import_driver, json_dumps, json_loads
 
 DASHBOARD_TYPE = "dashboard"
 SEARCH_LIMIT = 100
+SCROLL_TIMEOUT = "1m"
 
 warnings.simplefilter("ignore")
 
@@ -20,6 +18,8 @@ class ElasticStorage(Storage):
         self._host = host
         self._config = config[host]
         self._default_index = self._config['index']
+        self._batch_size = self._config.getint('batch-size', SEARCH_LIMIT)
+        self._refresh = self._config.get('refresh')
 
         addresses = self._config['hosts'].split(',')
         port = int(self._config['port'])
@@ -30,54 +30,113 @@ class ElasticStorage(Storage):
         else:
             http_auth = None
 
-        self._connection = Elasticsearch(addresses,
-                                         port=port,
-                                         use_ssl=use_ssl,
-                                         http_auth=http_auth)
+        elasticsearch = import_driver('elasticsearch', host)
+        self._connection = elasticsearch.Elasticsearch(addresses,
+                                                       port=port,
+                                                       use_ssl=use_ssl,
+                                                       http_auth=http_auth)
 
     def list(self):
-        hits = self._search(doc_type=DASHBOARD_TYPE,
-                            _source=False)
+        return [dashboard_id
+                for batch in self.list_batches()
+                for dashboard_id in batch]
 
-        return [hit['_id'] for hit in hits]
+    def list_batches(self):
+        """Yields dashboard ids in batches, paginating through all hits."""
+        for hits in self._scroll(doc_type=DASHBOARD_TYPE,
+                                 _source=False):
+            yield [hit['_id'] for hit in hits]
 
     def get(self, dashboard_id):
-        hits = self._search(doc_type=DASHBOARD_TYPE,
-                            _source=["dashboard"],
-                            body={'query': {'match': {'_id': dashboard_id}}})
+        doc = self._get(doc_type=DASHBOARD_TYPE,
+                        _source=["dashboard"],
+                        id=dashboard_id,
+                        realtime=True,
+                        ignore=404)
 
-        if not hits:
-            raise DocumentNotFound("There is no such dashboard: {}".format(dashboard_id))
+        return self._to_dashboard(dashboard_id, doc)
 
-        source = json.loads(hits[0]['_source']['dashboard'])
+    def get_many(self, dashboard_ids):
+        dashboards = []
 
-        return Dashboard(source, dashboard_id)
+        for i in range(0, len(dashboard_ids), self._batch_size):
+            chunk = dashboard_ids[i:i+self._batch_size]
+            docs = self._mget(doc_type=DASHBOARD_TYPE,
+                              _source=["dashboard"],
+                              body={'ids': chunk},
+                              realtime=True)
 
-    def save(self, dashboard_id, dashboard):
-        body = {'dashboard': json.dumps(dashboard.source)}
+            dashboards.extend(self._to_dashboard(dashboard_id, doc)
+                              for dashboard_id, doc in zip(chunk, docs))
 
-        try:
-            self.get(dashboard_id)
-            self._update(doc_type=DASHBOARD_TYPE,
-                         body={'doc': body},
-                         id=dashboard_id)
-        except DocumentNotFound:
-            self._create(doc_type=DASHBOARD_TYPE,
-                         body=body,
-                         id=dashboard_id)
+        return dashboards
+
+    def save(self, dashboard_id, dashboard):
+        body = {'dashboard': json_dumps(dashboard.source)}
+
+        self._update(doc_type=DASHBOARD_TYPE,
+                     body={'doc': body, 'doc_as_upsert': True},
+                     id=dashboard_id,
+                     **self._refresh_kwargs())
+
+    @property
+    def batch_size(self):
+        return self._batch_size
+
+    def save_many(self, dashboards):
+        for i in range(0, len(dashboards), self._batch_size):
+            actions = []
+            for dashboard_id, dashboard in dashboards[i:i+self._batch_size]:
+                body = {'dashboard': json_dumps(dashboard.source)}
+                actions.append({'update': {'_id': dashboard_id}})
+                actions.append({'doc': body, 'doc_as_upsert': True})
+
+            result = self._bulk(doc_type=DASHBOARD_TYPE,
+                                body=actions,
+                                **self._refresh_kwargs())
+
+            if result.get('errors'):
+                failed = [item['update']['_id'] for item in result['items']
+                          if 'error' in item['update']]
+                raise StorageError("Failed to save dashboards: {}".format(', '.join(failed)))
 
     def remove(self, dashboard_id):
         self._remove(doc_type=DASHBOARD_TYPE,
                      id=dashboard_id)
 
-    def _search(self, **kwargs):
+    def _to_dashboard(self, dashboard_id, doc):
+        # Errors, e.g. of a missing index, come without the document fields
+        if not doc.get('found'):
+            raise DocumentNotFound("There is no such dashboard: {}".format(dashboard_id))
+
+        source = json_loads(doc['_source']['dashboard'])
+        return Dashboard(source, dashboard_id)
+
+    def _get(self, **kwargs):
+        self._fill_index(kwargs)
+        return self._connection.get(**kwargs)
+
+    def _scroll(self, **kwargs):
         self._fill_index(kwargs)
-        result = self._connection.search(size=SEARCH_LIMIT, **kwargs)
-        return result['hits']['hits']
+        result = self._connection.search(scroll=SCROLL_TIMEOUT,
+                                         size=self._batch_size,
+                                         **kwargs)
+        scroll_id = result.get('_scroll_id')
+
+        try:
+            while result['hits']['hits']:
+                yield result['hits']['hits']
 
-    def _create(self, **kwargs):
+                result = self._connection.scroll(scroll_id=scroll_id,
+                                                 scroll=SCROLL_TIMEOUT)
+                scroll_id = result.get('_scroll_id', scroll_id)
+        finally:
+            if scroll_id:
+                self._connection.clear_scroll(scroll_id=scroll_id)
+
+    def _mget(self, **kwargs):
         self._fill_index(kwargs)
-        return self._connection.create(**kwargs)
+        return self._connection.mget(**kwargs)['docs']
 
     def _update(self, **kwargs):
         self._fill_index(kwargs)
@@ -87,6 +146,16 @@ class ElasticStorage(Storage):
         self._fill_index(kwargs)
         return self._connection.delete(**kwargs)
 
+    def _bulk(self, **kwargs):
+        self._fill_index(kwargs)
+        return self._connection.bulk(**kwargs)
+
+    def _refresh_kwargs(self):
+        if self._refresh:
+            return {'refresh': self._refresh}
+
+        return {}
+
     def _fill_index(self, kwargs):
         if 'index' not in kwargs:
             kwargs['index'] = self._default_index
@@ -0,0 +1,174 @@
+import os
+import time
+import threading
+
+from grafcli.documents import Dashboard
+from grafcli.exceptions import DocumentNotFound, InvalidDocument
+from grafcli.patch import diff, apply
+from grafcli.storage import Storage
+from grafcli.storage.system import data_dir, makepath, read_file, write_file
+from grafcli.utils import content_hash
+
+SNAPSHOTS_DIR = 'snapshots'
+INDEX = 'index'
+HISTORY_DIR = 'history'
+HEADS_DIR = 'heads'
+BASE_VERSION = 0
+
+
+def list_snapshot_stores():
+    full_path = os.path.join(data_dir(), SNAPSHOTS_DIR)
+    if not os.path.isdir(full_path):
+        return []
+
+    return sorted(name for name in os.listdir(full_path)
+                  if os.path.isdir(os.path.join(full_path, name)))
+
+
+class SnapshotStore(object):
+    """History of dashboards, kept as a base version plus JSON patch deltas.
+
+    Each dashboard has its own numbered versions: version 0 is stored in
+    full and every next one as a patch to the previous. A snapshot maps
+    dashboard names to their versions, so unchanged dashboards cost nothing.
+
+    The latest version of each dashboard is also kept in full as its head,
+    so new snapshots diff against it instead of replaying the history.
+    """
+
+    def __init__(self, name):
+        self._dir = os.path.join(SNAPSHOTS_DIR, name)
+        self._lock = threading.Lock()
+
+    def list(self):
+        return [str(snapshot['id']) for snapshot in self._read_index()['snapshots']]
+
+    def snapshots(self):
+        return self._read_index()['snapshots']
+
+    def snapshot(self, snapshot_id):
+        return self._find_snapshot(self._read_index(), snapshot_id)
+
+    def create(self, sources):
+        """Stores sources, given by dashboard name, as a new snapshot and returns its id."""
+        with self._lock:
+            index = self._read_index()
+            versions = {}
+
+            hashes = index.setdefault('hashes', {})
+
+            for name, source in sources.items():
+                head = index['heads'].get(name)
+                source_hash = content_hash(source)
+
+                if head is None:
+                    version = BASE_VERSION
+                    self._write_version(name, version, source)
+                elif hashes.get(name) == source_hash:
+                    # Unchanged since the last snapshot, nothing to read
+                    version = head
+                else:
+                    delta = diff(self._read_head(name, head), source)
+                    version = head + 1 if delta else head
+                    if delta:
+                        self._write_version(name, version, delta)
+
+                if version != head:
+                    self._write_head(name, version, source)
+
+                index['heads'][name] = version
+                hashes[name] = source_hash
+                versions[name] = version
+
+            snapshot_id = max([s['id'] for s in index['snapshots']] or [0]) + 1
+            index['snapshots'].append({
+                'id': snapshot_id,
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'dashboards': versions,
+            })
+
+            makepath(self._dir)
+            write_file(self._dir, INDEX, index)
+
+            return snapshot_id
+
+    def get(self, snapshot_id, name):
+        index = self._read_index()
+        versions = self._find_snapshot(index, snapshot_id)['dashboards']
+        if name not in versions:
+            raise DocumentNotFound("There is no such dashboard: {}".format(name))
+
+        if versions[name] == index['heads'].get(name):
+            return self._read_head(name, versions[name])
+
+        return self._read_version(name, versions[name])
+
+    def _find_snapshot(self, index, snapshot_id):
+        for snapshot in index['snapshots']:
+            if str(snapshot['id']) == str(snapshot_id):
+                return snapshot
+
+        raise DocumentNotFound("There is no such snapshot: {}".format(snapshot_id))
+
+    def _read_index(self):
+        try:
+            return read_file(self._dir, INDEX)
+        except DocumentNotFound:
+            return {'snapshots': [], 'heads': {}, 'hashes': {}}
+
+    def _history_dir(self, name):
+        return os.path.join(self._dir, HISTORY_DIR, name)
+
+    def _read_version(self, name, version):
+        source = read_file(self._history_dir(name), str(BASE_VERSION))
+
+        for delta_version in range(BASE_VERSION + 1, version + 1):
+            source = apply(source, read_file(self._history_dir(name), str(delta_version)))
+
+        return source
+
+    def _write_version(self, name, version, data):
+        makepath(self._history_dir(name))
+        write_file(self._history_dir(name), str(version), data)
+
+    def _read_head(self, name, version):
+        try:
+            head = read_file(os.path.join(self._dir, HEADS_DIR), name)
+        except DocumentNotFound:
+            head = None
+
+        # Missing or left ahead of the index by an interrupted run
+        if head is None or head['version'] != version:
+            return self._read_version(name, version)
+
+        return head['source']
+
+    def _write_head(self, name, version, source):
+        makepath(os.path.join(self._dir, HEADS_DIR))
+        write_file(os.path.join(self._dir, HEADS_DIR), name,
+                   {'version': version, 'source': source})
+
+
+class SnapshotStorage(Storage):
+    """Read-only view of dashboards in a single snapshot."""
+
+    def __init__(self, store, snapshot_id):
+        self._store = store
+        self._snapshot_id = snapshot_id
+
+    def list(self):
+        return sorted(self._store.snapshot(self._snapshot_id)['dashboards'])
+
+    def list_metadata(self):
+        versions = self._store.snapshot(self._snapshot_id)['dashboards']
+        return [{'slug': dashboard_id, 'version': versions[dashboard_id]}
+                for dashboard_id in sorted(versions)]
+
+    def get(self, dashboard_id):
+        return Dashboard(self._store.get(self._snapshot_id, dashboard_id), dashboard_id)
+
+    def save(self, dashboard_id, dashboard):
+        raise InvalidDocument("Snapshots are read-only")
+
+    def remove(self, dashboard_id):
+        raise InvalidDocument("Snapshots are read-only")
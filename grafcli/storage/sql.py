@@ -1,6 +1,9 @@
-import json
 import os
 import re
+import time
+import queue
+import threading
+from contextlib import contextmanager
 from abc import ABCMeta, abstractmethod
 
 from climb.config import config
@@ -8,38 +11,155 @@ from climb.config import config
 from grafcli.documents import Dashboard
 from grafcli.exceptions import DocumentNotFound
 from grafcli.storage import Storage
-from grafcli.utils import try_import
-
-sqlite3 = try_import('sqlite3')
-mysql = try_import('mysql.connector')
-psycopg2 = try_import('psycopg2')
+from grafcli.utils import import_driver, json_dumps, json_loads
 
 SELECT_PATTERN = re.compile(r'^select', re.IGNORECASE)
 
+DEFAULT_POOL_SIZE = 1
+DEFAULT_CHECK_INTERVAL = 60.0
+
+# Keeps the number of bound parameters below the limits of all backends
+IN_CLAUSE_LIMIT = 500
+
+
+class ConnectionPool(object):
+    """Bounded set of connections shared between threads, opened on demand."""
+
+    def __init__(self, connect, size, check_interval, errors):
+        self._connect = connect
+        self._check_interval = check_interval
+        self._errors = errors
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            connection = self._checkout()
+
+            try:
+                yield connection
+            except self._errors:
+                # Do not hand out a connection that may be broken
+                self._close(connection)
+                raise
+            except Exception:
+                self._rollback(connection)
+                self._idle.put((connection, time.monotonic()))
+                raise
+
+            self._idle.put((connection, time.monotonic()))
+
+    def _checkout(self):
+        try:
+            connection, released = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+        if time.monotonic() - released > self._check_interval and not self._ping(connection):
+            self._close(connection)
+            return self._connect()
+
+        return connection
+
+    def _ping(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            return True
+        except self._errors:
+            return False
+
+    def _rollback(self, connection):
+        try:
+            connection.rollback()
+        except self._errors:
+            pass
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
 
 class SQLStorage(Storage, metaclass=ABCMeta):
     NOW = "NOW()"
+    ON_CONFLICT = """ON CONFLICT (org_id, slug) DO UPDATE
+                     SET data = excluded.data, title = excluded.title, slug = %(new_slug)s"""
+
+    INSERT = """INSERT INTO dashboard (version, slug, title, data, org_id, created, updated)
+                VALUES (1, %(slug)s, %(title)s, %(data)s, 1, {now}, {now})"""
+    UPDATE = """UPDATE dashboard
+                SET data = %(data)s, title = %(title)s, slug = %(new_slug)s
+                WHERE slug = %(slug)s"""
 
     def __init__(self, host):
         self._host = host
         self._config = config[host]
-        self._connection = None
-        self._setup()
+        self._upsert = self._config.getboolean('upsert', False)
+
+        # No connection is made until the first query
+        self._pool = ConnectionPool(self._connect,
+                                    self._config.getint('pool-size', DEFAULT_POOL_SIZE),
+                                    self._config.getfloat('health-check-interval', DEFAULT_CHECK_INTERVAL),
+                                    self._connection_errors())
+
+    @abstractmethod
+    def _connect(self):
+        """Should return new connection."""
 
     @abstractmethod
-    def _setup(self):
-        """Should initialize _connection attribute."""
+    def _connection_errors(self):
+        """Should return exception types meaning the connection is unusable."""
+
+    def _format_query(self, query):
+        return query
+
+    def _begin(self, connection):
+        """Starts transaction, if connection does not do it implicitly."""
+
+    def _run(self, operation):
+        """Runs operation with pooled connection, reconnecting once if it fails."""
+        try:
+            with self._pool.connection() as connection:
+                return operation(connection)
+        except self._connection_errors():
+            pass
+
+        with self._pool.connection() as connection:
+            return operation(connection)
 
     def _execute(self, query, **kwargs):
-        cursor = self._connection.cursor()
+        query = self._format_query(query)
 
-        cursor.execute(query, kwargs)
+        def execute(connection):
+            cursor = connection.cursor()
 
-        if SELECT_PATTERN.search(query):
-            return cursor.fetchall()
-        else:
-            self._connection.commit()
-            return None
+            cursor.execute(query, kwargs)
+
+            if SELECT_PATTERN.search(query):
+                return cursor.fetchall()
+            else:
+                connection.commit()
+                return None
+
+        return self._run(execute)
+
+    def _execute_many(self, *statements):
+        """Executes (query, params list) pairs in a single transaction."""
+        def execute(connection):
+            self._begin(connection)
+            cursor = connection.cursor()
+
+            for query, params in statements:
+                if params:
+                    cursor.executemany(self._format_query(query), params)
+
+            connection.commit()
+
+        self._run(execute)
 
     def list(self):
         query = """SELECT slug
@@ -50,6 +170,19 @@ class SQLStorage(Storage, metaclass=ABCMeta):
 
         return [row[0] for row in result]
 
+    def list_metadata(self):
+        query = """SELECT slug, title, version, updated
+                   FROM dashboard
+                   ORDER BY id ASC"""
+
+        result = self._execute(query)
+
+        return [{'slug': slug,
+                 'title': title,
+                 'version': version,
+                 'updated': str(updated)}
+                for slug, title, version, updated in result]
+
     def get(self, dashboard_id):
         query = """SELECT data
                    FROM dashboard
@@ -63,25 +196,45 @@ class SQLStorage(Storage, metaclass=ABCMeta):
         if isinstance(source, bytes):
             source = source.decode('utf-8')
 
-        source = json.loads(source)
+        source = json_loads(source)
 
         return Dashboard(source, dashboard_id)
 
     def save(self, dashboard_id, dashboard):
-        try:
-            self.get(dashboard_id)
-            query = """UPDATE dashboard
-                       SET data = %(data)s, title = %(title)s, slug = %(new_slug)s
-                       WHERE slug = %(slug)s"""
-            self._execute(query,
-                          data=json.dumps(dashboard.source),
-                          title=dashboard.title,
-                          new_slug=dashboard.slug,
-                          slug=dashboard_id)
-        except DocumentNotFound:
-            query = """INSERT INTO dashboard (version, slug, title, data, org_id, created, updated)
-                       VALUES (1, %(slug)s, %(title)s, %(data)s, 1, {now}, {now})""".format(now=self.NOW)
-            self._execute(query, slug=dashboard_id, title=dashboard.title, data=json.dumps(dashboard.source))
+        self.save_many([(dashboard_id, dashboard)])
+
+    def save_many(self, dashboards):
+        rows = [{'slug': dashboard_id,
+                 'new_slug': dashboard.slug,
+                 'title': dashboard.title,
+                 'data': json_dumps(dashboard.source)}
+                for dashboard_id, dashboard in dashboards]
+
+        insert = self.INSERT.format(now=self.NOW)
+
+        if self._upsert:
+            self._execute_many(("{} {}".format(insert, self.ON_CONFLICT), rows))
+        else:
+            existing = self._existing([row['slug'] for row in rows])
+            self._execute_many((self.UPDATE, [row for row in rows if row['slug'] in existing]),
+                               (insert, [row for row in rows if row['slug'] not in existing]))
+
+    def _existing(self, dashboard_ids):
+        """Returns which of given slugs exist, without fetching dashboards' data."""
+        existing = set()
+
+        for i in range(0, len(dashboard_ids), IN_CLAUSE_LIMIT):
+            chunk = dashboard_ids[i:i+IN_CLAUSE_LIMIT]
+            params = {"slug{}".format(n): slug for n, slug in enumerate(chunk)}
+
+            query = """SELECT slug
+                       FROM dashboard
+                       WHERE slug IN ({})""".format(", ".join("%({})s".format(name)
+                                                            for name in params))
+
+            existing.update(row[0] for row in self._execute(query, **params))
+
+        return existing
 
     def remove(self, dashboard_id):
         query = """DELETE FROM dashboard
@@ -93,30 +246,52 @@ class SQLStorage(Storage, metaclass=ABCMeta):
 class SQLiteStorage(SQLStorage):
     NOW = "DATETIME('now')"
 
-    def _setup(self):
+    def _connect(self):
+        sqlite3 = import_driver('sqlite3', self._host)
         path = os.path.expanduser(self._config['path'])
-        self._connection = sqlite3.connect(path)
+        return sqlite3.connect(path, check_same_thread=False)
 
-    def _execute(self, query, **kwargs):
+    def _connection_errors(self):
+        sqlite3 = import_driver('sqlite3', self._host)
+        # Raised when operating on a closed database
+        return sqlite3.ProgrammingError,
+
+    def _format_query(self, query):
         query = query.replace('%s', '?')
-        query = re.sub(r'%\((\w+)\)s', r':\1', query)
-        return super()._execute(query, **kwargs)
+        return re.sub(r'%\((\w+)\)s', r':\1', query)
 
 
 class MySQLStorage(SQLStorage):
-    def _setup(self):
-        self._connection = mysql.connect(host=self._config['host'],
-                                         port=int(self._config['port']),
-                                         user=self._config['user'],
-                                         password=self._config['password'],
-                                         database=self._config['database'])
-        self._connection.autocommit = True
+    ON_CONFLICT = """ON DUPLICATE KEY UPDATE
+                     data = VALUES(data), title = VALUES(title), slug = %(new_slug)s"""
+
+    def _connect(self):
+        mysql = import_driver('mysql.connector', self._host)
+        connection = mysql.connect(host=self._config['host'],
+                                   port=int(self._config['port']),
+                                   user=self._config['user'],
+                                   password=self._config['password'],
+                                   database=self._config['database'])
+        connection.autocommit = True
+        return connection
+
+    def _connection_errors(self):
+        mysql = import_driver('mysql.connector', self._host)
+        return mysql.OperationalError, mysql.InterfaceError
+
+    def _begin(self, connection):
+        connection.start_transaction()
 
 
 class PostgreSQLStorage(SQLStorage):
-    def _setup(self):
-        self._connection = psycopg2.connect(host=self._config['host'],
-                                            port=int(self._config['port']),
-                                            user=self._config['user'],
-                                            password=self._config['password'],
-                                            database=self._config['database'])
+    def _connect(self):
+        psycopg2 = import_driver('psycopg2', self._host)
+        return psycopg2.connect(host=self._config['host'],
+                                port=int(self._config['port']),
+                                user=self._config['user'],
+                                password=self._config['password'],
+                                database=self._config['database'])
+
+    def _connection_errors(self):
+        psycopg2 = import_driver('psycopg2', self._host)
+        return psycopg2.OperationalError, psycopg2.InterfaceError
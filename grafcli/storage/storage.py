@@ -10,14 +10,34 @@ class Storage(object, metaclass=ABCMeta):
     def list(self):
         pass
 
+    def list_metadata(self):
+        """Returns slug, and title, version and updated time if known, of every dashboard."""
+        return [{'slug': dashboard_id}
+                for dashboard_id in self.list()]
+
     @abstractmethod
     def get(self, dashboard_id):
         pass
 
+    def get_many(self, dashboard_ids):
+        """Returns dashboards for given ids, in as few round trips as storage allows."""
+        return [self.get(dashboard_id)
+                for dashboard_id in dashboard_ids]
+
     @abstractmethod
     def save(self, dashboard_id, dashboard):
         pass
 
+    @property
+    def batch_size(self):
+        """Number of dashboards saved together when not set by the user."""
+        return 1
+
+    def save_many(self, dashboards):
+        """Saves (dashboard_id, dashboard) pairs, in as few round trips as storage allows."""
+        for dashboard_id, dashboard in dashboards:
+            self.save(dashboard_id, dashboard)
+
     @abstractmethod
     def remove(self, dashboard_id):
         pass
@@ -1,15 +1,35 @@
 import os
-import json
+import tempfile
 from climb.config import config
 
 from grafcli.documents import Dashboard
 from grafcli.exceptions import DocumentNotFound
 from grafcli.storage import Storage
+from grafcli.utils import json_dumps, json_loads
+
+TMP_PREFIX = '.'
+TMP_SUFFIX = '.tmp'
+
+
+def current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Mode open() would create files with. Read once on import, since the
+# umask can be read only by setting it, which is not safe between threads.
+FILE_MODE = 0o666 & ~current_umask()
+
 
 def data_dir():
     return os.path.expanduser(config['resources'].get('data-dir', ''))
 
 
+def fsync_enabled():
+    return config['resources'].getboolean('fsync', False)
+
+
 class SystemStorage(Storage):
     def __init__(self, base_dir):
         self._base_dir = base_dir
@@ -18,27 +38,64 @@ class SystemStorage(Storage):
     def list(self):
         return list_files(self._base_dir)
 
+    def list_metadata(self):
+        full_path = os.path.join(data_dir(), self._base_dir)
+
+        entries = []
+        for dashboard_id in self.list():
+            try:
+                stat = os.stat(os.path.join(full_path, to_file_format(dashboard_id)))
+            except FileNotFoundError:
+                # Removed since listed
+                continue
+
+            entries.append({'slug': dashboard_id, 'updated': stat.st_mtime_ns})
+
+        return entries
+
     def get(self, dashboard_id):
         try:
             source = read_file(self._base_dir, dashboard_id)
-            return Dashboard(source, dashboard_id)
         except DocumentNotFound:
             raise DocumentNotFound("There is no such dashboard: {}".format(dashboard_id))
 
+        return Dashboard(self._from_file(source), dashboard_id)
+
     def save(self, dashboard_id, dashboard):
-        write_file(self._base_dir, dashboard_id, dashboard.source)
+        write_file(self._base_dir, dashboard_id, self._to_file(dashboard.source))
+
+    def save_many(self, dashboards):
+        sync = fsync_enabled()
+
+        for dashboard_id, dashboard in dashboards:
+            write_file(self._base_dir, dashboard_id, self._to_file(dashboard.source),
+                       sync=sync, sync_dir=False)
+
+        # One directory sync covers all renames of the batch
+        if sync:
+            fsync_dir(os.path.join(data_dir(), self._base_dir))
 
     def remove(self, dashboard_id):
         remove_file(self._base_dir, dashboard_id)
 
+    def _from_file(self, data):
+        """Returns dashboard source from file content."""
+        return data
+
+    def _to_file(self, source):
+        """Returns file content from dashboard source."""
+        return source
+
 
 def list_files(*paths):
     full_path = os.path.join(data_dir(), *paths)
     if not os.path.isdir(full_path):
         raise DocumentNotFound("No documents found")
 
+    # Skip temporary files of writes in progress and hidden directories
     return [from_file_format(file)
-            for file in os.listdir(full_path)]
+            for file in os.listdir(full_path)
+            if not file.startswith(TMP_PREFIX)]
 
 
 def read_file(directory, name):
@@ -46,15 +103,47 @@ def read_file(directory, name):
     if not os.path.isfile(full_path):
         raise DocumentNotFound("File not found: {}".format(full_path))
 
-    with open(full_path, 'r') as f:
-        return json.loads(f.read())
+    # Fast JSON backends write non-ASCII characters as they are
+    with open(full_path, 'r', encoding='utf-8') as f:
+        return json_loads(f.read())
 
 
-def write_file(directory, name, data):
-    full_path = os.path.join(data_dir(), directory, to_file_format(name))
+def write_file(directory, name, data, sync=None, sync_dir=True):
+    """Writes file atomically, so readers never see it partially written."""
+    if sync is None:
+        sync = fsync_enabled()
+
+    dir_path = os.path.join(data_dir(), directory)
+    full_path = os.path.join(dir_path, to_file_format(name))
+
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path,
+                                    prefix=TMP_PREFIX + to_file_format(name),
+                                    suffix=TMP_SUFFIX)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(json_dumps(data))
+
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        # mkstemp creates files readable by the owner only
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, full_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    if sync and sync_dir:
+        fsync_dir(dir_path)
+
 
-    with open(full_path, 'w') as f:
-        f.write(json.dumps(data))
+def fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
 
 def remove_file(directory, name):
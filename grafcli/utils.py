@@ -1,23 +1,110 @@
 import json
+import math
+import hashlib
 import importlib
-from pygments import highlight, lexers, formatters
+from functools import lru_cache
 from climb.config import config
 
-from grafcli.exceptions import CommandCancelled
+from grafcli.exceptions import CommandCancelled, ConfigError, HostConfigError
+
+
+# Fastest first, json is always available
+JSON_BACKENDS = ('orjson', 'ujson', 'json')
 
 
 def json_pretty(data, colorize=False):
+    # Always stdlib, since fast backends can not reproduce this exact format
     pretty = json.dumps(data,
                         sort_keys=True,
                         indent=4,
                         separators=(',', ': '))
 
     if colorize:
+        from pygments import highlight, lexers, formatters
         pretty = highlight(pretty, lexers.JsonLexer(), formatters.TerminalFormatter())
 
     return pretty.strip()
 
 
+def json_dumps(data):
+    """Serializes data to compact JSON with the configured backend."""
+    backend = json_backend()
+
+    try:
+        if backend.__name__ == 'orjson':
+            content = backend.dumps(data)
+
+            # orjson silently writes NaN and infinities as null, so only
+            # output with nulls needs checking
+            if b'null' not in content or not has_non_finite(data):
+                return content.decode('utf-8')
+        elif backend.__name__ == 'ujson':
+            return backend.dumps(data, ensure_ascii=False, escape_forward_slashes=False)
+    except (TypeError, ValueError, OverflowError):
+        # e.g. integers too big for fast backends
+        pass
+
+    return json.dumps(data)
+
+
+def has_non_finite(data):
+    """Checks if data holds NaN or infinite floats."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+
+    return False
+
+
+def json_loads(content):
+    """Parses JSON from str or bytes with the configured backend."""
+    backend = json_backend()
+
+    if backend is not json:
+        try:
+            return backend.loads(content)
+        except ValueError:
+            # e.g. NaN values, accepted only by stdlib
+            pass
+
+    return json.loads(content)
+
+
+@lru_cache(maxsize=None)
+def json_backend():
+    """Returns JSON module set in config, or the fastest one installed."""
+    name = config.get('grafcli', 'json', fallback='auto')
+    if name == 'auto':
+        for module_name in JSON_BACKENDS:
+            module = try_import(module_name)
+            if module:
+                return module
+
+    if name not in JSON_BACKENDS:
+        raise ConfigError("Unknown json library: {}, use one of auto, {}"
+                          .format(name, ', '.join(JSON_BACKENDS)))
+
+    module = try_import(name)
+    if not module:
+        raise ConfigError("Configured json library {} is not installed".format(name))
+
+    return module
+
+
+def content_hash(data):
+    """Returns hash of normalized JSON, independent of keys order."""
+    # Always stdlib, so hashes do not depend on installed backends
+    normalized = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
 def confirm_prompt(question):
     if config['grafcli'].getboolean('force'):
         return
@@ -33,3 +120,11 @@ def try_import(module_name):
         return importlib.import_module(module_name)
     except ImportError:
         return None
+
+
+def import_driver(module_name, host):
+    module = try_import(module_name)
+    if not module:
+        raise HostConfigError("Module {} required by host {} is not installed".format(module_name, host))
+
+    return module
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+import io
+import os
+import sys
+import json
+import time
+import random
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+from climb.exceptions import CLIException, UnknownCommand
+load_config_file(CONFIG_PATH)
+
+import grafcli.commands
+from grafcli.args import GrafArgs
+from grafcli.core import GrafCLI
+from grafcli.commands import GrafCommands, add_to_archive, read_manifest, write_manifest_entry, sync_hash
+from grafcli.documents import Dashboard
+from grafcli.exceptions import CommandCancelled
+
+from tests.test_documents import dashboard_source
+
+NAMES = ['dashboard-{}'.format(i) for i in range(20)]
+
+
+def mock_source(name):
+    source = dashboard_source()
+    source['title'] = name
+    return source
+
+
+def mock_resources():
+    resources = Mock()
+
+    def get(path):
+        # Finish out of order
+        time.sleep(random.random() / 100)
+        name = os.path.basename(path)
+        return Dashboard(mock_source(name), name)
+
+    def get_many(path, names):
+        return [get(os.path.join(path, name)) for name in names]
+
+    resources.list_dashboards.return_value = list(reversed(NAMES))
+    # Listing index not refreshed yet
+    resources.list.return_value = NAMES[:1]
+    resources.get.side_effect = get
+    resources.get_many.side_effect = get_many
+    resources.batch_size.return_value = 1
+    return resources
+
+
+def write_archive(path, names):
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode='w:gz') as archive:
+        for name in names:
+            add_to_archive(archive, '{}.json'.format(name), json.dumps(mock_source(name)))
+
+    with open(path, 'wb') as file:
+        file.write(data.getvalue())
+
+
+def read_entries(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.endswith('\n')]
+
+
+def read_archive(path):
+    with tarfile.open(path, 'r:gz') as archive:
+        return [(member.name, archive.extractfile(member).read())
+                for member in archive]
+
+
+class CommandsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resources_patcher = patch('grafcli.commands.Resources', side_effect=mock_resources)
+        self.resources_patcher.start()
+
+        self.commands = GrafCommands(Mock(current_path='/'))
+        self.resources = self.commands.resources
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        self.resources_patcher.stop()
+
+    def tmp_path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_backup_jobs(self):
+        self.commands.backup('/remote/any', self.tmp_path('serial.tgz'))
+        expected = read_archive(self.tmp_path('serial.tgz'))
+
+        self.assertListEqual([name for name, _ in expected],
+                             ['{}.json'.format(name) for name in sorted(NAMES)])
+
+        for jobs, batch_size in ((4, 1), (4, 3), (2, 20)):
+            archive_path = self.tmp_path('parallel.tgz')
+            self.commands.backup('/remote/any', archive_path, jobs=jobs, batch_size=batch_size)
+
+            self.assertListEqual(read_archive(archive_path), expected)
+
+    def test_backup_listing(self):
+        self.commands.backup('/remote/any', self.tmp_path('backup.tgz'))
+        self.resources.list_dashboards.assert_called_once_with('/remote/any')
+
+        self.resources.supports_batch.return_value = False
+        self.commands.backup('/remote/any/dashboard-0', self.tmp_path('rows.tgz'))
+        self.resources.list.assert_called_once_with('/remote/any/dashboard-0')
+
+    def test_backup_bounded(self):
+        written = []
+        fetched_ahead = []
+        add_to_archive = grafcli.commands.add_to_archive
+
+        def add(archive, name, content):
+            written.append(name)
+            fetched_ahead.append(self.resources.get.call_count - len(written))
+            add_to_archive(archive, name, content)
+
+        with patch('grafcli.commands.add_to_archive', side_effect=add):
+            self.commands.backup('/remote/any', self.tmp_path('backup.tgz'), jobs=2)
+
+        self.assertEqual(len(written), len(NAMES))
+        self.assertLessEqual(max(fetched_ahead), 2 * 2)
+
+    def test_backup_restore(self):
+        archive_path = self.tmp_path('backup.tgz')
+        self.commands.backup('/remote/any', archive_path, jobs=4)
+
+        restored = {}
+        self.resources.save.side_effect = lambda path, document: restored.update({path: document.source})
+        self.commands.restore(archive_path, '/backups', jobs=4)
+
+        self.assertDictEqual(restored, {'/backups/{}'.format(name): mock_source(name)
+                                        for name in NAMES})
+
+    def test_batch_arguments(self):
+        args = GrafArgs(Mock())
+
+        for command in (['backup', '/remote/any', 'backup.tgz'], ['restore', 'backup.tgz', '/remote/any'],
+                        ['sync', '/backups', '/remote/any'], ['snapshot', '/remote/any', 'nightly']):
+            parsed = args.parse(command[0], '-j', '4', '-b', '2', *command[1:])
+            self.assertEqual((parsed.jobs, parsed.batch_size), (4, 2), command[0])
+
+            for option in ('-j', '-b'):
+                with self.assertRaises(UnknownCommand, msg=command[0]):
+                    args.parse(command[0], option, '0', *command[1:])
+
+        self.assertIsNone(args.parse('restore', 'backup.tgz', '/remote/any').batch_size)
+        self.assertEqual(args.parse('backup', '/remote/any', 'backup.tgz').batch_size, 1)
+
+    def test_manifest(self):
+        manifest_path = self.tmp_path('backup.tgz.manifest')
+        self.assertSetEqual(read_manifest(manifest_path), set())
+
+        with open(manifest_path, 'w') as file:
+            write_manifest_entry(file, 'a.json', 'done')
+            write_manifest_entry(file, 'b.json', 'failed', 'any error')
+            write_manifest_entry(file, 'c.json', 'cancelled')
+            write_manifest_entry(file, 'b.json', 'done')
+            write_manifest_entry(file, 'c.json', 'done')
+            # Interrupted while writing
+            file.write('{"name": "d.json", "sta')
+
+        self.assertSetEqual(read_manifest(manifest_path), {'a.json', 'b.json', 'c.json'})
+        self.assertDictEqual(read_entries(manifest_path)[1],
+                             {'name': 'b.json', 'status': 'failed', 'error': 'any error'})
+
+    def test_restore_resume(self):
+        archive_path = self.tmp_path('backup.tgz')
+        write_archive(archive_path, ['a', 'b', 'c', 'd'])
+
+        def save(path, document):
+            if path.endswith('/b'):
+                raise ValueError("any error")
+            if path.endswith('/c'):
+                raise CommandCancelled("Cancelled.")
+
+        self.resources.save.side_effect = save
+
+        with self.assertRaisesRegex(CLIException, "Failed to restore 1 dashboard"):
+            self.commands.restore(archive_path, '/backups', jobs=2)
+
+        statuses = {entry['name']: entry['status']
+                    for entry in read_entries(archive_path + '.manifest')}
+        self.assertDictEqual(statuses, {'a.json': 'done', 'b.json': 'failed',
+                                        'c.json': 'cancelled', 'd.json': 'done'})
+
+        self.resources.save.reset_mock(side_effect=True)
+        self.commands.restore(archive_path, '/backups', resume=True)
+
+        self.assertListEqual(sorted(call[0][0] for call in self.resources.save.call_args_list),
+                             ['/backups/b', '/backups/c'])
+        self.assertSetEqual(read_manifest(archive_path + '.manifest'),
+                            {'a.json', 'b.json', 'c.json', 'd.json'})
+
+    def test_restore_batch_skipped(self):
+        archive_path = self.tmp_path('backup.tgz')
+        write_archive(archive_path, ['a', 'b', 'c'])
+        self.resources.save_many.return_value = ['b']
+
+        self.commands.restore(archive_path, '/backups', batch_size=3)
+
+        statuses = {entry['name']: entry['status']
+                    for entry in read_entries(archive_path + '.manifest')}
+        self.assertDictEqual(statuses, {'a.json': 'done', 'b.json': 'cancelled', 'c.json': 'done'})
+        self.assertSetEqual(read_manifest(archive_path + '.manifest'), {'a.json', 'c.json'})
+
+    def test_restore_host_batch_size(self):
+        archive_path = self.tmp_path('backup.tgz')
+        write_archive(archive_path, ['a', 'b', 'c', 'd', 'e'])
+        self.resources.batch_size.return_value = 3
+        self.resources.save_many.return_value = []
+
+        self.commands.restore(archive_path, '/remote/elastic')
+
+        self.resources.batch_size.assert_called_once_with('/remote/elastic')
+        self.assertListEqual([[name for name, _ in call[0][1]] for call in self.resources.save_many.call_args_list],
+                             [['a', 'b', 'c'], ['d', 'e']])
+        self.resources.save.assert_not_called()
+
+        self.commands.restore(archive_path, '/remote/elastic', batch_size=1)
+        self.assertEqual(self.resources.save.call_count, 5)
+
+    def test_restore_jobs_requires_force(self):
+        archive_path = self.tmp_path('backup.tgz')
+        write_archive(archive_path, ['a'])
+
+        with patch.dict(config['grafcli'], {'force': 'off'}):
+            with self.assertRaises(CLIException):
+                self.commands.restore(archive_path, '/backups', jobs=2)
+
+            self.commands.restore(archive_path, '/backups')
+
+        self.resources.save.assert_called_once()
+
+
+class SyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_patcher = patch.dict(config['resources'], {'data-dir': self.tmp_dir.name})
+        self.config_patcher.start()
+
+        self.commands = GrafCommands(Mock(current_path='/'))
+        self.resources = self.commands.resources
+
+        self.save('/backups', 'same', title="Same")
+        self.save('/backups', 'changed', title="Changed")
+        self.save('/backups', 'ignored', title="Ignored", id=1, version=3)
+        self.save('/backups', 'added', title="Added")
+
+        self.save('/templates/dashboards', 'same', title="Same")
+        self.save('/templates/dashboards', 'changed', title="Changed before", id=5)
+        self.save('/templates/dashboards', 'ignored', title="Ignored", id=7, version=1)
+        self.save('/templates/dashboards', 'removed', title="Removed")
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def save(self, path, name, **fields):
+        source = dashboard_source()
+        source.update(fields)
+        self.resources.save(os.path.join(path, name), Dashboard(source, name))
+
+    def sources(self, path):
+        return {name: self.resources.get(os.path.join(path, name)).source
+                for name in self.resources.list_dashboards(path)}
+
+    def test_sync_hash(self):
+        dashboard = Dashboard(dict(dashboard_source(), id=1, version=2), 'any')
+        same = Dashboard(dict(dashboard_source(), id=3, version=4), 'other')
+        changed = Dashboard(dict(dashboard_source(), id=1, version=2, title="Other"), 'any')
+
+        self.assertEqual(sync_hash(dashboard), sync_hash(same))
+        self.assertNotEqual(sync_hash(dashboard), sync_hash(changed))
+
+    def test_dry_run(self):
+        before = self.sources('/templates/dashboards')
+
+        self.assertEqual(self.commands.sync('/backups', '/templates/dashboards', dry_run=True),
+                         "add: added\nupdate: changed")
+        self.assertEqual(self.commands.sync('/backups', '/templates/dashboards', dry_run=True, delete=True),
+                         "add: added\nupdate: changed\nremove: removed")
+
+        self.assertDictEqual(self.sources('/templates/dashboards'), before)
+
+    def test_sync(self):
+        self.commands.sync('/backups', '/templates/dashboards', jobs=2, batch_size=2)
+        synced = self.sources('/templates/dashboards')
+
+        self.assertSetEqual(set(synced), {'same', 'changed', 'ignored', 'added', 'removed'})
+        self.assertEqual(synced['changed']['title'], "Changed")
+        self.assertEqual(synced['changed']['id'], 5)
+        self.assertEqual(synced['ignored']['id'], 7)
+
+    def test_sync_unchanged(self):
+        self.commands.sync('/backups', '/templates/dashboards')
+
+        with patch.object(self.resources, 'get_many', wraps=self.resources.get_many) as get_many:
+            self.assertEqual(self.commands.sync('/backups', '/templates/dashboards', dry_run=True), "")
+            get_many.assert_not_called()
+
+            self.save('/backups', 'same', title="Same changed")
+            self.assertEqual(self.commands.sync('/backups', '/templates/dashboards', dry_run=True),
+                             "update: same")
+            get_many.assert_called_once_with('/backups', ['same'])
+
+    def test_mv_declined(self):
+        self.save('/backups', 'removed', title="Removed")
+
+        with patch.dict(config['grafcli'], {'force': 'off'}), \
+                patch('builtins.input', side_effect=['n', 'y']):
+            self.commands.mv(['/backups/changed', '/backups/removed', '/templates/dashboards'], None)
+
+        self.assertSetEqual(set(self.resources.list_dashboards('/backups')),
+                            {'same', 'changed', 'ignored', 'added'})
+        self.assertEqual(self.sources('/templates/dashboards')['changed']['title'], "Changed before")
+
+    def test_snapshot_command(self):
+        with patch('climb.core.load_config'):
+            cli = GrafCLI()
+
+        cli.execute('snapshot', '/backups', 'nightly')
+
+        self.assertListEqual(self.resources.list('/snapshots/nightly'), ['1'])
+        self.assertSetEqual(set(self.resources.list_dashboards('/snapshots/nightly/1')),
+                            {'same', 'changed', 'ignored', 'added'})
+
+    def test_sync_delete(self):
+        self.commands.sync('/backups', '/templates/dashboards', delete=True)
+
+        self.assertSetEqual(set(self.sources('/templates/dashboards')),
+                            {'same', 'changed', 'ignored', 'added'})
+        self.assertEqual(self.commands.sync('/backups', '/templates/dashboards', dry_run=True, delete=True), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
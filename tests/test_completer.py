@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import os
+import sys
+import threading
+import subprocess
+import unittest
+from unittest.mock import Mock
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file
+load_config_file(CONFIG_PATH)
+
+from grafcli.completer import GrafCompleter
+
+
+def mock_completer(nodes):
+    cli = Mock()
+    cli.args.commands = []
+    cli.current_path = '/'
+    cli.commands.resources.list.side_effect = lambda path: nodes[path]
+
+    return GrafCompleter(cli)
+
+
+class GrafCompleterTest(unittest.TestCase):
+
+    def test_path(self):
+        completer = mock_completer({
+            '/': ['backups', 'remote', 'templates'],
+            '/remote': ['host-a', 'host-b', 'other'],
+        })
+
+        self.assertListEqual(completer.path('', ''), ['backups', 'remote', 'templates'])
+        self.assertListEqual(completer.path('re', 're'), ['remote/'])
+        self.assertListEqual(completer.path('/remote/', ''), ['host-a', 'host-b', 'other'])
+        self.assertListEqual(completer.path('/remote/host', 'host'), ['host-a', 'host-b'])
+        self.assertListEqual(completer.path('/remote/x', 'x'), [])
+
+    def test_cache(self):
+        completer = mock_completer({'/': ['a', 'b']})
+        resources = completer._cli.commands.resources
+
+        completer.path('', '')
+        completer.path('', 'a')
+        self.assertEqual(resources.list.call_count, 1)
+
+        completer._ttl = -1
+        completer.path('', '')
+        self.assertEqual(resources.list.call_count, 2)
+
+    def test_timeout(self):
+        completer = mock_completer({'/': ['a', 'b']})
+        completer._timeout = 0.01
+        completer.path('', '')
+
+        completer._ttl = -1
+        release = threading.Event()
+        resources = completer._cli.commands.resources
+        resources.list.side_effect = lambda path: release.wait() and ['a', 'b', 'c']
+
+        # Slow listing falls back to stale candidates
+        self.assertListEqual(completer.path('', ''), ['a', 'b'])
+
+        release.set()
+        completer._pending['/'].result()
+        completer._ttl = 60
+        self.assertListEqual(completer.path('', ''), ['a', 'b', 'c'])
+
+    def test_exit_with_hung_listing(self):
+        code = """
+import sys, time
+sys.path.insert(0, {lib_path!r})
+from tests.test_completer import mock_completer
+completer = mock_completer({{}})
+completer._timeout = 0.01
+completer._cli.commands.resources.list.side_effect = lambda path: time.sleep(60)
+print(completer.path('', ''))
+""".format(lib_path=LIB_PATH)
+
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=LIB_PATH, timeout=10)
+        self.assertEqual(output.decode().strip(), '[]')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import os
 import sys
+import gc
+import weakref
 import unittest
 
 LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
@@ -8,7 +10,7 @@ LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
 sys.path.append(LIB_PATH)
 
 from grafcli.exceptions import InvalidPath, InvalidDocument, DocumentNotFound
-from grafcli.documents import Dashboard, Row, Panel, get_id, slug
+from grafcli.documents import Dashboard, Row, Panel, PanelIds, get_id, slug
 
 
 def dashboard_source(rows=None):
@@ -114,6 +116,46 @@ class DocumentsTest(unittest.TestCase):
         self.assertEqual(dashboard.title, 'Any Dashboard title')
         self.assertEqual(dashboard.slug, 'any-dashboard-title')
 
+    def test_dashboard_lazy(self):
+        source = dashboard_source([row_source("A", [panel_source(1, "AA")])])
+        dashboard = Dashboard(source, 'any_dashboard')
+
+        self.assertIsNone(dashboard._rows)
+        self.assertIs(dashboard.source, source)
+        self.assertEqual(dashboard.slug, 'any-dashboard-title')
+        self.assertIsNone(dashboard._rows)
+
+        self.assertListEqual(rows(dashboard), ["1-a"])
+        self.assertEqual(dashboard.source, source)
+
+        # Sources not understood by the document tree still pass through
+        source = {'title': 'Any title', 'panels': []}
+        self.assertIs(Dashboard(source, 'any_dashboard').source, source)
+
+    def test_dashboard_source(self):
+        dashboard = mock_dashboard('any_dashboard')
+        row = dashboard.rows[1]
+        source_rows = dashboard.source['rows']
+
+        self.assertIs(dashboard.source['rows'], source_rows)
+
+        row.panels[0].update(Panel(panel_source(10, "BC")))
+        self.assertEqual(dashboard.source['rows'][1]['panels'][0]['title'], "BC")
+
+        row.move_child('4-bb', '1')
+        self.assertListEqual([panel['title'] for panel in dashboard.source['rows'][1]['panels']], ["BB", "BC"])
+
+        row.remove_child('4-bb')
+        dashboard.move_child('2-b', '1')
+        self.assertListEqual([row['title'] for row in dashboard.source['rows']], ["B", "A"])
+        self.assertListEqual([panel['title'] for panel in dashboard.source['rows'][0]['panels']], ["BC"])
+
+        dashboard.rows[1].update(mock_row("C"))
+        self.assertEqual(dashboard.source['rows'][1]['title'], "C")
+
+        source_rows = dashboard.source['rows']
+        self.assertIs(dashboard.source['rows'], source_rows)
+
     def test_dashboard_update(self):
         dashboard = mock_dashboard('any_dashboard')
 
@@ -177,6 +219,102 @@ class DocumentsTest(unittest.TestCase):
 
         self.assertEqual(dashboard.max_panel_id(), 15)
 
+    def test_dashboard_panel_ids(self):
+        dashboard = mock_dashboard('any_dashboard')
+
+        dashboard.remove_child("2-b")
+        dashboard.update(mock_row())
+        self.assertListEqual([panel.id for panel in dashboard.rows[1].panels], [3, 4])
+
+        dashboard.rows[0].remove_child("2-ab")
+        dashboard.rows[1].update_panel_ids()
+        self.assertListEqual([panel.id for panel in dashboard.rows[1].panels], [2, 3])
+
+        dashboard.rows[0].update(mock_panel())
+        self.assertEqual(dashboard.rows[0].panels[1].id, 4)
+
+    def test_dashboard_child_index(self):
+        dashboard = mock_dashboard('any_dashboard')
+        dashboard.update(Row(row_source("C")))
+
+        self.assertIs(dashboard.row('b'), dashboard.rows[1])
+        with self.assertRaises(DocumentNotFound):
+            dashboard.row('d')
+
+        dashboard.remove_child('1-a')
+        self.assertListEqual(rows(dashboard), ["1-b", "2-c"])
+        with self.assertRaises(DocumentNotFound):
+            dashboard.row('a')
+
+        dashboard.rows[0].update(mock_row('D'))
+        self.assertEqual(dashboard.row('d').id, 1)
+
+        dashboard.move_child('c', '1')
+        self.assertListEqual(rows(dashboard), ["1-c", "2-d"])
+
+    def test_row_child_index(self):
+        dashboard = mock_dashboard('any_dashboard')
+        row = dashboard.rows[1]
+
+        self.assertEqual(row.panel('bb').id, 4)
+        self.assertIs(row.panel('3-any-name'), row.panels[0])
+
+        row.panels[0].update(Panel(panel_source(10, "BC")))
+        self.assertEqual(row.panel('bc').id, 3)
+        with self.assertRaises(DocumentNotFound):
+            row.panel('ba')
+
+        dashboard.rows[0].remove_child('2-ab')
+        row.update_panel_ids()
+        self.assertListEqual(panels(row), ["2-bc", "3-bb"])
+        self.assertEqual(row.panel('2-bc').title, "BC")
+        self.assertEqual(row.panel('3-bb').title, "BB")
+        with self.assertRaises(DocumentNotFound):
+            row.panel('4-bb')
+
+        row.remove_child('3-bb')
+        with self.assertRaises(DocumentNotFound):
+            row.panel('3-bb')
+        with self.assertRaises(DocumentNotFound):
+            row.panel('bb')
+
+    def test_parent(self):
+        dashboard = mock_dashboard('any_dashboard')
+        row = dashboard.rows[0]
+        panel = row.panels[0]
+
+        self.assertIs(row.parent, dashboard)
+        self.assertIs(panel.parent, row)
+        self.assertIsNone(dashboard.parent)
+        self.assertFalse(hasattr(panel, '__dict__'))
+
+    def test_no_reference_cycles(self):
+        dashboard = mock_dashboard('any_dashboard')
+        dashboard.rows[0].update(mock_panel())
+        dashboard_ref = weakref.ref(dashboard)
+        row_ref = weakref.ref(dashboard.rows[0])
+
+        gc.disable()
+        try:
+            del dashboard
+            self.assertIsNone(dashboard_ref())
+            self.assertIsNone(row_ref())
+        finally:
+            gc.enable()
+
+    def test_panel_ids(self):
+        ids = PanelIds()
+        self.assertEqual(ids.allocate(), 1)
+
+        ids.add(5)
+        ids.add(5)
+        ids.remove(5)
+        self.assertEqual(ids.max(), 5)
+
+        ids.remove(5)
+        self.assertEqual(ids.max(), 1)
+        self.assertEqual(ids.allocate(), 2)
+
     def test_row(self):
         row = mock_row()
 
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import os
+import sys
+import unittest
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+
+sys.path.append(LIB_PATH)
+
+from grafcli.patch import diff, apply
+
+
+class PatchTest(unittest.TestCase):
+
+    def check(self, old, new):
+        operations = diff(old, new)
+        self.assertEqual(apply(old, operations), new)
+        return operations
+
+    def test_diff(self):
+        self.assertListEqual(self.check({'a': 1}, {'a': 1}), [])
+        self.assertListEqual(self.check({'a': 1}, {'a': 2}),
+                             [{'op': 'replace', 'path': '/a', 'value': 2}])
+        self.assertListEqual(self.check({'a': 1}, {'b': 1}),
+                             [{'op': 'remove', 'path': '/a'},
+                              {'op': 'add', 'path': '/b', 'value': 1}])
+        self.assertListEqual(self.check({'a/b~': 1}, {'a/b~': True}),
+                             [{'op': 'replace', 'path': '/a~1b~0', 'value': True}])
+
+    def test_diff_lists(self):
+        self.check([1, 2, 3], [1, 4])
+        self.check([1], [1, 2, 3])
+        self.check({'rows': [{'panels': [{'id': 1}, {'id': 2}]}]},
+                   {'rows': [{'panels': [{'id': 1, 'title': 'x'}]}, {'panels': []}]})
+
+    def test_replace_root(self):
+        self.assertListEqual(self.check([1], {'a': 1}),
+                             [{'op': 'replace', 'path': '', 'value': {'a': 1}}])
+
+    def test_apply_does_not_modify_document(self):
+        document = {'a': [1]}
+        apply(document, [{'op': 'add', 'path': '/a/-', 'value': 2}])
+        self.assertEqual(document, {'a': [1]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@
 import os
 import sys
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 
 LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
 CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
@@ -30,7 +30,7 @@ class ResourcesTest(unittest.TestCase):
     def test_list(self):
         r = Resources()
 
-        self.assertEqual(r.list(None), ['backups', 'remote', 'templates'])
+        self.assertEqual(r.list(None), ['backups', 'remote', 'snapshots', 'templates'])
         self.assertEqual(r.list('remote'), ['localhost'])
         self.assertEqual(r.list('templates'), ('dashboards', 'rows', 'panels'))
 
@@ -60,6 +60,21 @@ class ResourcesTest(unittest.TestCase):
         with self.assertRaises(InvalidPath):
             r._parse_path('/invalid/path')
 
+    def test_lazy_templates(self):
+        rows = Mock()
+
+        with patch.dict('grafcli.resources.resources.TEMPLATE_TYPES', {'rows': rows}):
+            r = Resources()
+            r.list('templates')
+            rows.assert_not_called()
+
+            r.list('templates/rows')
+            r.list('templates/rows')
+            rows.assert_called_once_with()
+
+            with self.assertRaises(InvalidPath):
+                r.list('templates/invalid')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,17 +2,18 @@
 import os
 import sys
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
 CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
 
 sys.path.append(LIB_PATH)
 
-from climb.config import load_config_file
+from climb.config import load_config_file, config
 load_config_file(CONFIG_PATH)
 
 from grafcli.exceptions import InvalidPath, DocumentNotFound, InvalidDocument
+from grafcli.resources.cache import DocumentCache
 from grafcli.resources.common import CommonResources
 from grafcli.documents import Dashboard, Row, Panel
 
@@ -153,6 +154,32 @@ class CommonResourcesTest(unittest.TestCase):
         with self.assertRaises(DocumentNotFound):
             res.save(panel, 'any_dashboard', '1-a', '100-new-panel')
 
+    def test_save_many(self):
+        res = DummyResources()
+        dashboards = [('a', Dashboard(dashboard_source(), 'x')),
+                      ('b', Dashboard(dashboard_source(), 'y'))]
+
+        res.save_many(dashboards)
+        saved = res._storage.save_many.call_args[0][0]
+        self.assertListEqual([(name, dashboard.id) for name, dashboard in saved],
+                             [('a', 'a'), ('b', 'b')])
+
+        with self.assertRaises(InvalidDocument):
+            res.save_many([('a', Row(row_source("New row", [])))])
+
+    def test_save_many_declined(self):
+        res = DummyResources()
+        res._storage.list.return_value = ['a', 'b']
+        dashboards = [(name, Dashboard(dashboard_source(), name)) for name in ('a', 'b', 'c')]
+
+        with patch.dict(config['grafcli'], {'force': 'off'}), \
+                patch('builtins.input', side_effect=['y', 'n']):
+            skipped = res.save_many(dashboards)
+
+        self.assertListEqual(skipped, ['b'])
+        saved = res._storage.save_many.call_args[0][0]
+        self.assertListEqual([name for name, _ in saved], ['a', 'c'])
+
     def test_remove_dashboard(self):
         res = DummyResources()
 
@@ -176,6 +203,65 @@ class CommonResourcesTest(unittest.TestCase):
         self.assertEqual(res._storage.dashboard_id, 'any_dashboard')
         self.assertEqual(len(res._storage.dashboard.row('1-aa').panels), 1)
 
+    def test_cache(self):
+        res = DummyResources()
+        res._cache = DocumentCache(ttl=60, size=1)
+
+        res.list('any_dashboard')
+        row = res.get('any_dashboard', '1-a')
+        row.remove_child('1-aa')
+        res.get('any_dashboard', '1-a', '2-ab')
+        self.assertEqual(res._storage.get.call_count, 1)
+        self.assertEqual(len(res.list('any_dashboard', '1-a')), 2)
+
+        # Whole dashboards and writes always read from storage
+        self.assertEqual(len(res.get('any_dashboard').rows), 2)
+        self.assertEqual(res._storage.get.call_count, 2)
+        res.remove('any_dashboard', '1-a')
+        self.assertEqual(res._storage.get.call_count, 3)
+        res.list('any_dashboard')
+        self.assertEqual(res._storage.get.call_count, 4)
+
+        res.list('another_dashboard')
+        res.list('any_dashboard')
+        self.assertEqual(res._storage.get.call_count, 6)
+
+        # Does not evict the cached one
+        res.get('another_dashboard')
+        res.list('any_dashboard')
+        self.assertEqual(res._storage.get.call_count, 7)
+
+    def test_cache_write_fresh(self):
+        res = DummyResources()
+        res._cache = DocumentCache(ttl=60)
+        res.list('any_dashboard')
+
+        # Changed remotely after caching
+        remote = mock_dashboard('any_dashboard')
+        remote.update(Row(row_source("C", [])))
+        res._storage.get.side_effect = lambda _: remote
+
+        res.save(Panel(panel_source(1, "New panel")), 'any_dashboard', '1-a')
+        self.assertEqual(len(res._storage.dashboard.rows), 3)
+        self.assertEqual(len(res.get('any_dashboard').rows), 3)
+
+    def test_list_dashboards(self):
+        res = DummyResources()
+        res._index = Mock()
+        res._index.list.return_value = ['stale']
+        res._storage.list.return_value = ['a', 'b']
+
+        self.assertListEqual(res.list(), ['stale'])
+        self.assertListEqual(res.list_dashboards(), ['a', 'b'])
+
+    def test_cache_expiry(self):
+        res = DummyResources()
+        res._cache = DocumentCache(ttl=-1)
+
+        res.list('any_dashboard')
+        res.list('any_dashboard')
+        self.assertEqual(res._storage.get.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.resources.hashes import ContentHashes, listed_version
+
+
+class ContentHashesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.config_patcher = patch.dict(config['resources'], {'data-dir': self.data_dir})
+        self.config_patcher.start()
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        shutil.rmtree(self.data_dir)
+
+    def test_listed_version(self):
+        self.assertIsNone(listed_version({'slug': 'a'}))
+        self.assertEqual(listed_version({'slug': 'a', 'version': 2}), [2, None])
+
+    def test_outdated(self):
+        entries = [{'slug': 'a', 'version': 1},
+                   {'slug': 'b', 'updated': '2020-01-01'},
+                   {'slug': 'c'}]
+
+        hashes = ContentHashes('/remote/any')
+        self.assertListEqual(hashes.outdated(entries), ['a', 'b', 'c'])
+
+        for entry in entries:
+            hashes.put(entry, 'hash-' + entry['slug'], 1)
+        self.assertListEqual(hashes.outdated(entries), ['c'])
+        self.assertEqual(hashes.get('c')['hash'], 'hash-c')
+
+        hashes.save()
+        hashes = ContentHashes('/remote/any')
+        self.assertListEqual(hashes.outdated(entries), ['c'])
+        self.assertListEqual(hashes.outdated([{'slug': 'a', 'version': 2}]), ['a'])
+        self.assertListEqual(ContentHashes('/remote/other').outdated(entries), ['a', 'b', 'c'])
+
+        hashes.discard('a')
+        self.assertListEqual(hashes.outdated(entries), ['a', 'c'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.resources.index import ListingIndex
+
+
+class ListingIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.config_patcher = patch.dict(config['resources'], {'data-dir': self.data_dir})
+        self.config_patcher.start()
+
+        self.storage = Mock()
+        self.storage.list_metadata.return_value = [{'slug': 'a', 'title': 'A'},
+                                                   {'slug': 'b', 'title': 'B'}]
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        shutil.rmtree(self.data_dir)
+
+    def test_list(self):
+        index = ListingIndex('any_host', self.storage)
+
+        self.assertListEqual(index.list(), ['a', 'b'])
+        self.assertListEqual(index.list(), ['a', 'b'])
+        self.assertEqual(self.storage.list_metadata.call_count, 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.data_dir, 'index', 'any_host.json')))
+
+        # Another process reads the index from disk
+        index = ListingIndex('any_host', self.storage)
+        self.assertListEqual(index.list(), ['a', 'b'])
+        self.assertEqual(self.storage.list_metadata.call_count, 1)
+
+    def test_stale(self):
+        index = ListingIndex('any_host', self.storage, ttl=-1)
+
+        index.list()
+        index.list()
+        self.assertEqual(self.storage.list_metadata.call_count, 2)
+
+    def test_invalidate(self):
+        index = ListingIndex('any_host', self.storage)
+
+        index.list()
+        index.invalidate()
+        index.invalidate()
+        self.storage.list_metadata.return_value = [{'slug': 'c'}]
+        self.assertListEqual(index.list(), ['c'])
+
+    def test_from_config(self):
+        with patch.dict(config['resources'], {'index-ttl': '0'}):
+            self.assertIsNone(ListingIndex.from_config('any_host', self.storage))
+
+        self.assertIsInstance(ListingIndex.from_config('any_host', self.storage), ListingIndex)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import os
+import sys
+import unittest
+import subprocess
+from unittest.mock import patch
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.exceptions import HostConfigError
+from grafcli.storage import STORAGE_TYPES, LOCAL_STORAGE_TYPES, load_storage_class, get_remote_storage
+from grafcli.storage.storage import Storage
+
+HEAVY_MODULES = ('pygments', 'requests', 'elasticsearch', 'mysql', 'psycopg2', 'sqlite3')
+
+IMPORTS = """
+import sys
+sys.path.insert(0, {lib_path!r})
+import grafcli.core
+print(','.join(name for name in {modules!r} if name in sys.modules))
+"""
+
+
+class StorageTypesTest(unittest.TestCase):
+
+    def test_storage_types(self):
+        for path in list(STORAGE_TYPES.values()) + list(LOCAL_STORAGE_TYPES.values()):
+            self.assertTrue(issubclass(load_storage_class(path), Storage), path)
+
+    def test_lazy_imports(self):
+        code = IMPORTS.format(lib_path=LIB_PATH, modules=HEAVY_MODULES)
+        output = subprocess.check_output([sys.executable, '-c', code])
+
+        self.assertEqual(output.decode().strip(), '')
+
+    def test_missing_driver(self):
+        config['hosts']['broken'] = 'on'
+        config['broken'] = {
+            'type': 'elastic',
+            'hosts': 'localhost',
+            'port': '9200',
+            'index': 'grafana-dash',
+            'ssl': 'off',
+            'user': '',
+            'password': '',
+        }
+
+        with patch.dict(sys.modules, {'elasticsearch': None}):
+            with self.assertRaises(HostConfigError):
+                get_remote_storage('broken')
+
+        config.remove_option('hosts', 'broken')
+        config.remove_section('broken')
+
+
+if __name__ == "__main__":
+    unittest.main()
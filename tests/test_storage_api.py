@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+import os
+import sys
+import unittest
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch, Mock
+
+import requests
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.documents import slug
+from grafcli.resources.common import CommonResources
+from grafcli.storage.api import APIStorage
+from grafcli.utils import JSON_BACKENDS, json_backend, json_loads, try_import
+
+from tests.test_documents import mock_dashboard
+
+
+def http_error(status_code):
+    return requests.HTTPError(response=Mock(status_code=status_code))
+
+
+def posted(call):
+    _, url, data = call[0]
+    return url, data['overwrite'], data['dashboard']['id']
+
+
+def mock_grafana(dashboards):
+    """Returns mock of _call answering like Grafana holding given sources, by slug."""
+    def call(method, url, data=None):
+        if method == 'GET':
+            name = url.split('/')[-1]
+            if name not in dashboards:
+                raise http_error(404)
+
+            return {'dashboard': dashboards[name]}
+
+        source = data['dashboard']
+        name = slug(source['title'])
+        if not data['overwrite'] and name in dashboards:
+            raise http_error(412)
+
+        ids = [dashboard['id'] for dashboard in dashboards.values()]
+        if data['overwrite'] and source.get('id') is not None and source['id'] not in ids:
+            raise http_error(404)
+
+        dashboards[name] = source
+
+    return Mock(side_effect=call)
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    bodies = []
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self.bodies.append(self.rfile.read(length))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+class APIStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.env_patcher = patch.dict(os.environ, {}, clear=False)
+        self.env_patcher.start()
+        os.environ.pop('GRAFANA_API_TOKEN', None)
+
+    def tearDown(self):
+        self.env_patcher.stop()
+
+    def test_session_is_reused(self):
+        storage = APIStorage('localhost')
+
+        self.assertIs(storage.session, storage.session)
+
+    def test_session_auth(self):
+        storage = APIStorage('localhost')
+        self.assertEqual(storage.session.auth, ('admin', 'admin'))
+
+        os.environ['GRAFANA_API_TOKEN'] = 'any_token'
+        storage = APIStorage('localhost')
+        self.assertEqual(storage.session.headers['Authorization'], 'Bearer any_token')
+        self.assertIsNone(storage.session.auth)
+
+    def test_session_pool(self):
+        storage = APIStorage('localhost')
+        adapter = storage.session.get_adapter('http://grafana:3000/api')
+
+        self.assertEqual(adapter._pool_maxsize, 10)
+        self.assertEqual(adapter.max_retries.total, 3)
+
+    def test_save_new_dashboard(self):
+        storage = APIStorage('localhost')
+        storage._call = Mock()
+
+        dashboard = mock_dashboard('any_dashboard')
+        dashboard.source['id'] = 42
+        storage.save('any_dashboard', dashboard)
+
+        storage._call.assert_called_once()
+        self.assertEqual(posted(storage._call.call_args), ('dashboards/db', False, None))
+        self.assertEqual(dashboard.source['id'], 42)
+
+    def test_save_existing_dashboard(self):
+        storage = APIStorage('localhost')
+        storage._call = Mock(side_effect=[http_error(412), None])
+
+        dashboard = mock_dashboard('any_dashboard')
+        dashboard.source['id'] = 42
+        storage.save('any_dashboard', dashboard)
+
+        self.assertEqual(storage._call.call_count, 2)
+        self.assertEqual(posted(storage._call.call_args), ('dashboards/db', True, None))
+
+    def test_save_listed_dashboard(self):
+        storage = APIStorage('localhost')
+        storage._call = Mock(return_value=[{'uri': 'db/any_dashboard'}])
+        storage.list()
+
+        storage._call = Mock()
+        dashboard = mock_dashboard('any_dashboard')
+        dashboard.source['id'] = 42
+        storage.save('any_dashboard', dashboard)
+
+        storage._call.assert_called_once()
+        self.assertEqual(posted(storage._call.call_args), ('dashboards/db', True, 42))
+
+        storage.remove('any_dashboard')
+        storage._call = Mock()
+        storage.save('any_dashboard', dashboard)
+
+        storage._call.assert_called_once()
+        self.assertEqual(posted(storage._call.call_args), ('dashboards/db', False, None))
+
+    def test_save_stale_listing(self):
+        storage = APIStorage('localhost')
+        storage._call = Mock(return_value=[{'uri': 'db/any_dashboard'}])
+        storage.list()
+
+        storage._call = Mock(side_effect=[http_error(404), None])
+        storage.save('any_dashboard', mock_dashboard('any_dashboard'))
+
+        self.assertEqual(storage._call.call_count, 2)
+        self.assertEqual(posted(storage._call.call_args), ('dashboards/db', True, None))
+
+    def test_save_foreign_id(self):
+        storage = APIStorage('localhost')
+        storage._call = mock_grafana({'any-dashboard-title': dict(mock_dashboard('any').source, id=1)})
+        storage.get('any-dashboard-title')
+
+        # Copied from another host, where it had another id
+        dashboard = mock_dashboard('any-dashboard-title')
+        dashboard.source['id'] = 42
+        storage.save('any-dashboard-title', dashboard)
+
+        self.assertEqual(storage._call.call_count, 3)
+        self.assertEqual(posted(storage._call.call_args), ('dashboards/db', True, None))
+
+    def test_save_requests(self):
+        for force, expected in (('on', 2), ('off', 2)):
+            storage = APIStorage('localhost')
+            storage._call = mock_grafana({'any-dashboard-title': dict(mock_dashboard('any').source, id=1)})
+
+            resources = CommonResources()
+            resources._storage = storage
+
+            dashboard = mock_dashboard('any-dashboard-title')
+            dashboard.source['id'] = 1
+            with patch.dict(config['grafcli'], {'force': force}), \
+                    patch('builtins.input', return_value='y'):
+                resources.save(dashboard, 'any-dashboard-title')
+
+            self.assertEqual(storage._call.call_count, expected, force)
+
+        storage._call = mock_grafana({})
+        with patch.dict(config['grafcli'], {'force': 'on'}):
+            resources.save(mock_dashboard('any-dashboard-title'), 'any-dashboard-title')
+
+        storage._call.assert_called_once()
+
+    def test_save_error(self):
+        storage = APIStorage('localhost')
+        storage._call = Mock(side_effect=http_error(500))
+
+        with self.assertRaises(requests.HTTPError):
+            storage.save('any_dashboard', mock_dashboard('any_dashboard'))
+
+        storage._call.assert_called_once()
+
+    def test_call_non_ascii(self):
+        server = HTTPServer(('127.0.0.1', 0), RecordingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        url = 'http://127.0.0.1:{}/api'.format(server.server_port)
+        data = {'dashboard': {'title': 'Zażółć →'}}
+
+        for name in JSON_BACKENDS:
+            if not try_import(name):
+                continue
+
+            RecordingHandler.bodies = []
+            json_backend.cache_clear()
+            with patch.dict(config['grafcli'], {'json': name}), \
+                    patch.dict(config['localhost'], {'url': url}):
+                storage = APIStorage('localhost')
+                storage._call('post', 'dashboards/db', data)
+
+            self.assertEqual(json_loads(RecordingHandler.bodies[0]), data, name)
+
+        json_backend.cache_clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
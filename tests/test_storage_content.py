@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.documents import Dashboard
+from grafcli.storage.content import ContentStorage, BLOBS_DIR
+from grafcli.storage.system import SystemStorage
+
+from tests.test_documents import dashboard_source, row_source, panel_source, mock_dashboard
+
+
+def shared_dashboard(title, panel_ids):
+    source = dashboard_source([
+        row_source("Shared", [panel_source(id, "Shared panel") for id in panel_ids]),
+    ])
+    source['title'] = title
+    return Dashboard(source, title)
+
+
+class ContentStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.config_patcher = patch.dict(config['resources'], {'data-dir': self.data_dir})
+        self.config_patcher.start()
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        shutil.rmtree(self.data_dir)
+
+    def blobs(self):
+        return sorted(file
+                      for _, _, files in os.walk(os.path.join(self.data_dir, 'any_dir', BLOBS_DIR))
+                      for file in files)
+
+    def test_save(self):
+        storage = ContentStorage('any_dir')
+        dashboard = mock_dashboard('a')
+        expected = dashboard.source
+
+        storage.save('a', dashboard)
+        self.assertListEqual(storage.list(), ['a'])
+        self.assertDictEqual(storage.get('a').source, expected)
+        # Two rows and four panels
+        self.assertEqual(len(self.blobs()), 6)
+
+    def test_deduplication(self):
+        storage = ContentStorage('any_dir')
+
+        storage.save('a', shared_dashboard('a', [1, 2]))
+        storage.save('b', shared_dashboard('b', [3, 4]))
+
+        # One panel blob shared by all panels, row blobs differ by panel ids
+        self.assertEqual(len(self.blobs()), 3)
+        self.assertListEqual([panel.id for panel in storage.get('b').rows[0].panels], [3, 4])
+
+    def test_collect_garbage(self):
+        storage = ContentStorage('any_dir')
+        storage.save('a', shared_dashboard('a', [1, 2]))
+        storage.save('b', mock_dashboard('b'))
+
+        self.assertEqual(storage.collect_garbage(), 0)
+
+        storage.remove('b')
+        self.assertEqual(storage.collect_garbage(), 6)
+        self.assertEqual(len(self.blobs()), 2)
+        self.assertEqual(storage.get('a').title, 'a')
+
+    def test_plain_files(self):
+        SystemStorage('any_dir').save('a', mock_dashboard('a'))
+
+        storage = ContentStorage('any_dir')
+        self.assertEqual(len(storage.get('a').rows), 2)
+        self.assertEqual(storage.collect_garbage(), 0)
+
+    def test_without_rows(self):
+        storage = ContentStorage('any_dir')
+        source = {'title': 'a', 'panels': [panel_source(1, "Any panel")]}
+
+        storage.save('a', Dashboard(source, 'a'))
+        storage.save('b', mock_dashboard('b'))
+
+        self.assertDictEqual(storage.get('a').source, source)
+        storage.remove('b')
+        self.assertEqual(storage.collect_garbage(), 6)
+        self.assertEqual(len(self.blobs()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
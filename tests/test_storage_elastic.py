@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import unittest
+from unittest.mock import patch
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.exceptions import DocumentNotFound, StorageError
+from grafcli.storage.elastic import ElasticStorage
+
+from tests.test_documents import dashboard_source, mock_dashboard
+
+
+def hits(*ids, scroll_id='any_scroll'):
+    return {
+        '_scroll_id': scroll_id,
+        'hits': {'hits': [{'_id': id} for id in ids]},
+    }
+
+
+def doc(id, found=True):
+    source = dashboard_source()
+    source['title'] = id
+
+    return {
+        '_id': id,
+        'found': found,
+        '_source': {'dashboard': json.dumps(source)},
+    }
+
+
+class ElasticStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        config['elastic_test'] = {
+            'type': 'elastic',
+            'hosts': 'localhost',
+            'port': '9200',
+            'index': 'grafana-dash',
+            'ssl': 'off',
+            'user': '',
+            'password': '',
+            'batch-size': '2',
+        }
+
+        self.elastic_patcher = patch('grafcli.storage.elastic.import_driver')
+        self.elastic_patcher.start()
+        self.storage = ElasticStorage('elastic_test')
+        self.connection = self.storage._connection
+
+    def tearDown(self):
+        self.elastic_patcher.stop()
+        config.remove_section('elastic_test')
+
+    def test_list(self):
+        self.connection.search.return_value = hits('a', 'b')
+        self.connection.scroll.side_effect = [hits('c', 'd'), hits('e'), hits()]
+
+        self.assertListEqual(list(self.storage.list_batches()), [['a', 'b'], ['c', 'd'], ['e']])
+        self.assertEqual(self.connection.search.call_args[1]['size'], 2)
+        self.connection.clear_scroll.assert_called_once_with(scroll_id='any_scroll')
+
+        self.connection.search.return_value = hits()
+        self.assertListEqual(self.storage.list(), [])
+
+    def test_get(self):
+        self.connection.get.return_value = doc('a')
+
+        dashboard = self.storage.get('a')
+        self.assertEqual(dashboard.id, 'a')
+        self.assertTrue(self.connection.get.call_args[1]['realtime'])
+        self.connection.search.assert_not_called()
+
+        self.connection.get.return_value = doc('b', found=False)
+        with self.assertRaises(DocumentNotFound):
+            self.storage.get('b')
+
+        # Missing index
+        self.connection.get.return_value = {'error': {'type': 'index_not_found_exception'}, 'status': 404}
+        with self.assertRaises(DocumentNotFound):
+            self.storage.get('b')
+
+    def test_get_many(self):
+        self.connection.mget.side_effect = [{'docs': [doc('a'), doc('b')]},
+                                            {'docs': [doc('c')]}]
+
+        dashboards = self.storage.get_many(['a', 'b', 'c'])
+        self.assertListEqual([dashboard.id for dashboard in dashboards], ['a', 'b', 'c'])
+        self.assertEqual(self.connection.mget.call_args[1]['body'], {'ids': ['c']})
+
+        self.connection.mget.side_effect = [{'docs': [doc('a', found=False)]}]
+        with self.assertRaises(DocumentNotFound):
+            self.storage.get_many(['a'])
+
+    def test_batch_size(self):
+        self.assertEqual(self.storage.batch_size, 2)
+
+    def test_save(self):
+        self.storage.save('a', mock_dashboard('a'))
+
+        kwargs = self.connection.update.call_args[1]
+        self.assertEqual(kwargs['id'], 'a')
+        self.assertTrue(kwargs['body']['doc_as_upsert'])
+        self.assertNotIn('refresh', kwargs)
+        self.connection.search.assert_not_called()
+
+    def test_save_many(self):
+        config['elastic_test']['refresh'] = 'wait_for'
+        storage = ElasticStorage('elastic_test')
+        connection = storage._connection
+        connection.bulk.return_value = {'errors': False, 'items': []}
+
+        storage.save_many([(id, mock_dashboard(id)) for id in ('a', 'b', 'c')])
+
+        self.assertEqual(connection.bulk.call_count, 2)
+        kwargs = connection.bulk.call_args[1]
+        self.assertEqual(kwargs['refresh'], 'wait_for')
+        self.assertEqual(kwargs['index'], 'grafana-dash')
+        self.assertListEqual([action['update']['_id'] for action in kwargs['body'][::2]], ['c'])
+
+        connection.bulk.return_value = {
+            'errors': True,
+            'items': [{'update': {'_id': 'a', 'error': 'any error'}},
+                      {'update': {'_id': 'b'}}],
+        }
+        with self.assertRaisesRegex(StorageError, 'a$'):
+            storage.save_many([(id, mock_dashboard(id)) for id in ('a', 'b')])
+
+
+if __name__ == "__main__":
+    unittest.main()
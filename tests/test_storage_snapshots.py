@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import grafcli.storage.snapshots
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.exceptions import DocumentNotFound, InvalidDocument
+from grafcli.resources import Resources
+from grafcli.storage.snapshots import SnapshotStore, SnapshotStorage, list_snapshot_stores
+
+from tests.test_documents import mock_dashboard
+
+
+class SnapshotStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.config_patcher = patch.dict(config['resources'], {'data-dir': self.data_dir})
+        self.config_patcher.start()
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        shutil.rmtree(self.data_dir)
+
+    def history(self, name):
+        return sorted(os.listdir(os.path.join(self.data_dir, 'snapshots', 'any', 'history', name)))
+
+    def test_create(self):
+        store = SnapshotStore('any')
+        a = mock_dashboard('a').source
+        b = mock_dashboard('b').source
+
+        self.assertEqual(store.create({'a': a, 'b': b}), 1)
+
+        a['title'] = 'changed'
+        self.assertEqual(store.create({'a': a, 'b': b}), 2)
+        self.assertEqual(store.create({'a': a}), 3)
+
+        self.assertListEqual(store.list(), ['1', '2', '3'])
+        self.assertListEqual(list_snapshot_stores(), ['any'])
+
+        self.assertEqual(store.get(1, 'a')['title'], 'Any Dashboard title')
+        self.assertEqual(store.get(2, 'a')['title'], 'changed')
+        self.assertEqual(store.get(2, 'b'), b)
+
+        with self.assertRaises(DocumentNotFound):
+            store.get(3, 'b')
+        with self.assertRaises(DocumentNotFound):
+            store.get(4, 'a')
+
+        # Unchanged dashboards are not stored again
+        self.assertListEqual(self.history('a'), ['0.json', '1.json'])
+        self.assertListEqual(self.history('b'), ['0.json'])
+
+    def test_create_reads_heads(self):
+        store = SnapshotStore('any')
+        a = mock_dashboard('a').source
+        b = mock_dashboard('b').source
+
+        for i in range(5):
+            a['title'] = 'changed {}'.format(i)
+            store.create({'a': a, 'b': b})
+
+        a['title'] = 'changed again'
+        with patch('grafcli.storage.snapshots.read_file',
+                   wraps=grafcli.storage.snapshots.read_file) as read_file:
+            self.assertEqual(store.create({'a': a, 'b': b}), 6)
+
+        # Index and head of the changed dashboard only, no history replayed
+        self.assertEqual(read_file.call_count, 2)
+        self.assertEqual(store.get(6, 'a')['title'], 'changed again')
+        self.assertEqual(store.get(3, 'a')['title'], 'changed 2')
+        self.assertEqual(store.get(6, 'b'), b)
+
+    def test_create_without_head(self):
+        store = SnapshotStore('any')
+        a = mock_dashboard('a').source
+        store.create({'a': a})
+
+        shutil.rmtree(os.path.join(self.data_dir, 'snapshots', 'any', 'heads'))
+
+        a['title'] = 'changed'
+        store.create({'a': a})
+        self.assertEqual(store.get(1, 'a')['title'], 'Any Dashboard title')
+        self.assertEqual(store.get(2, 'a')['title'], 'changed')
+
+    def test_storage(self):
+        store = SnapshotStore('any')
+        store.create({'a': mock_dashboard('a').source})
+
+        storage = SnapshotStorage(store, '1')
+        self.assertListEqual(storage.list(), ['a'])
+        self.assertEqual(storage.get('a').id, 'a')
+
+        with self.assertRaises(InvalidDocument):
+            storage.save('a', mock_dashboard('a'))
+
+    def test_resources(self):
+        r = Resources()
+        r.create_snapshot('any', {'a': mock_dashboard('a')})
+
+        self.assertListEqual(r.list('/snapshots'), ['any'])
+        self.assertListEqual(r.list('/snapshots/any'), ['1'])
+        self.assertListEqual(r.list('/snapshots/any/1'), ['a'])
+        self.assertListEqual(r.list('/snapshots/any/1/a'), ['1-a', '2-b'])
+        self.assertTrue(r.supports_batch('/snapshots/any/1'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.exceptions import DocumentNotFound
+from grafcli.documents import Dashboard
+from grafcli.storage.sql import SQLiteStorage
+
+from tests.test_documents import dashboard_source
+
+SCHEMA = """CREATE TABLE dashboard (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                version INTEGER NOT NULL,
+                slug TEXT NOT NULL,
+                title TEXT NOT NULL,
+                data TEXT NOT NULL,
+                org_id INTEGER NOT NULL,
+                created DATETIME NOT NULL,
+                updated DATETIME NOT NULL)"""
+UNIQUE_SLUG = "CREATE UNIQUE INDEX UQE_dashboard_org_id_slug ON dashboard (org_id, slug)"
+
+
+def mock_dashboard(id, title):
+    source = dashboard_source()
+    source['title'] = title
+    return Dashboard(source, id)
+
+
+class SQLiteStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        config['sqlite_test'] = {
+            'type': 'sqlite',
+            'path': os.path.join(self.tmp_dir, 'grafana.db'),
+        }
+
+    def tearDown(self):
+        config.remove_section('sqlite_test')
+        shutil.rmtree(self.tmp_dir)
+
+    def storage(self, *statements):
+        storage = SQLiteStorage('sqlite_test')
+        for statement in (SCHEMA,) + statements:
+            storage._execute(statement)
+
+        return storage
+
+    def check_save(self, storage):
+        storage.save('a', mock_dashboard('a', 'a'))
+        storage.save_many([('b', mock_dashboard('b', 'b')),
+                           ('c', mock_dashboard('c', 'c'))])
+        self.assertListEqual(storage.list(), ['a', 'b', 'c'])
+
+        storage.save_many([('a', mock_dashboard('a', 'a')),
+                           ('b', mock_dashboard('b', 'new b')),
+                           ('d', mock_dashboard('d', 'd'))])
+        self.assertListEqual(storage.list(), ['a', 'new-b', 'c', 'd'])
+        self.assertEqual(storage.get('new-b').title, 'new b')
+
+        with self.assertRaises(DocumentNotFound):
+            storage.get('b')
+
+    def test_save(self):
+        self.check_save(self.storage())
+
+    def test_list_metadata(self):
+        storage = self.storage()
+        storage.save('a', mock_dashboard('a', 'A'))
+
+        entries = storage.list_metadata()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['slug'], 'a')
+        self.assertEqual(entries[0]['title'], 'A')
+        self.assertEqual(entries[0]['version'], 1)
+
+    def test_save_upsert(self):
+        config['sqlite_test']['upsert'] = 'on'
+        self.check_save(self.storage(UNIQUE_SLUG))
+
+    def test_save_many_rollback(self):
+        config['sqlite_test']['upsert'] = 'on'
+        storage = self.storage()
+
+        # Upsert without unique index fails, nothing should be written
+        with self.assertRaises(Exception):
+            storage.save_many([('a', mock_dashboard('a', 'a'))])
+
+        self.assertListEqual(storage.list(), [])
+
+    def test_lazy_connect(self):
+        storage = SQLiteStorage('sqlite_test')
+        self.assertFalse(os.path.exists(config['sqlite_test']['path']))
+
+        storage._execute(SCHEMA)
+        self.assertTrue(os.path.exists(config['sqlite_test']['path']))
+
+    def test_reconnect(self):
+        storage = self.storage()
+        storage.save('a', mock_dashboard('a', 'a'))
+
+        connection, _ = storage._pool._idle.get()
+        connection.close()
+        storage._pool._idle.put((connection, 0))
+
+        self.assertListEqual(storage.list(), ['a'])
+
+    def test_pool(self):
+        config['sqlite_test']['pool-size'] = '2'
+        storage = self.storage()
+
+        with storage._pool.connection() as first:
+            with storage._pool.connection() as second:
+                self.assertIsNot(first, second)
+
+        # Most recently released connection is reused first
+        with storage._pool.connection() as connection:
+            self.assertIs(connection, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+from unittest.mock import patch
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.exceptions import DocumentNotFound
+from grafcli.storage.system import SystemStorage
+
+from tests.test_documents import mock_dashboard
+
+
+class SystemStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.config_patcher = patch.dict(config['resources'], {'data-dir': self.data_dir})
+        self.config_patcher.start()
+
+    def tearDown(self):
+        self.config_patcher.stop()
+        shutil.rmtree(self.data_dir)
+
+    def test_save(self):
+        storage = SystemStorage('any_dir')
+
+        storage.save('a', mock_dashboard('a'))
+        storage.save('a', mock_dashboard('a'))
+        self.assertListEqual(storage.list(), ['a'])
+        self.assertEqual(len(storage.get('a').rows), 2)
+        self.assertListEqual(os.listdir(os.path.join(self.data_dir, 'any_dir')), ['a.json'])
+
+        storage.remove('a')
+        with self.assertRaises(DocumentNotFound):
+            storage.get('a')
+
+    def test_save_many_fsync(self):
+        storage = SystemStorage('any_dir')
+
+        with patch.dict(config['resources'], {'fsync': 'on'}), \
+                patch('grafcli.storage.system.os.fsync') as fsync:
+            storage.save_many([('a', mock_dashboard('a')),
+                               ('b', mock_dashboard('b'))])
+
+        # Both files and the directory once
+        self.assertEqual(fsync.call_count, 3)
+        self.assertListEqual(sorted(storage.list()), ['a', 'b'])
+
+    def test_failed_write(self):
+        storage = SystemStorage('any_dir')
+        storage.save('a', mock_dashboard('a'))
+
+        with patch('grafcli.storage.system.json_dumps', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                storage.save('a', mock_dashboard('a'))
+
+        self.assertListEqual(os.listdir(os.path.join(self.data_dir, 'any_dir')), ['a.json'])
+        self.assertEqual(len(storage.get('a').rows), 2)
+
+    def test_umask(self):
+        code = """
+import os, sys
+sys.path.insert(0, {lib_path!r})
+from tests.test_storage_system import SystemStorage, config, mock_dashboard
+config['resources']['data-dir'] = {data_dir!r}
+SystemStorage('any_dir').save('a', mock_dashboard('a'))
+print(oct(os.stat(os.path.join({data_dir!r}, 'any_dir', 'a.json')).st_mode & 0o777))
+""".format(lib_path=LIB_PATH, data_dir=self.data_dir)
+
+        for umask, mode in ((0o022, '0o644'), (0o077, '0o600')):
+            output = subprocess.check_output([sys.executable, '-c', code], cwd=LIB_PATH, timeout=10,
+                                             preexec_fn=lambda: os.umask(umask))
+            self.assertEqual(output.decode().strip(), mode)
+
+    def test_list_skips_temporary_files(self):
+        storage = SystemStorage('any_dir')
+        open(os.path.join(self.data_dir, 'any_dir', '.a.json1234.tmp'), 'w').close()
+
+        self.assertListEqual(storage.list(), [])
+
+    def test_non_ascii(self):
+        storage = SystemStorage('any_dir')
+        dashboard = mock_dashboard('a')
+        dashboard.source['title'] = 'Zażółć →'
+        storage.save('a', dashboard)
+
+        with open(os.path.join(self.data_dir, 'any_dir', 'a.json'), 'rb') as file:
+            self.assertIn('Zażółć →', file.read().decode('utf-8'))
+
+        self.assertEqual(storage.get('a').source['title'], 'Zażółć →')
+
+    def test_list_metadata(self):
+        storage = SystemStorage('any_dir')
+        storage.save('a', mock_dashboard('a'))
+        [entry] = storage.list_metadata()
+
+        os.utime(os.path.join(self.data_dir, 'any_dir', 'a.json'), ns=(1, 1))
+        self.assertEqual(entry['slug'], 'a')
+        self.assertNotEqual(storage.list_metadata(), [entry])
+
+
+if __name__ == "__main__":
+    unittest.main()
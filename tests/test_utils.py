@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import math
+import unittest
+from unittest.mock import patch
+
+LIB_PATH = os.path.dirname(os.path.realpath(__file__)) + '/../'
+CONFIG_PATH = os.path.join(LIB_PATH, 'grafcli.conf.example')
+
+sys.path.append(LIB_PATH)
+
+from climb.config import load_config_file, config
+load_config_file(CONFIG_PATH)
+
+from grafcli.exceptions import ConfigError
+from grafcli.utils import json_backend, json_dumps, json_loads, json_pretty, try_import, JSON_BACKENDS
+
+DATA = {
+    'title': 'Zażółć / "gęślą"',
+    'rows': [{'id': 1, 'span': 1.5, 'big': 2 ** 70, 'enabled': True, 'link': None}],
+}
+
+
+class JSONCodecTest(unittest.TestCase):
+
+    def tearDown(self):
+        json_backend.cache_clear()
+
+    def backends(self):
+        for name in JSON_BACKENDS:
+            if not try_import(name):
+                continue
+
+            json_backend.cache_clear()
+            with patch.dict(config['grafcli'], {'json': name}):
+                yield json_backend()
+
+    def test_roundtrip(self):
+        for backend in self.backends():
+            self.assertEqual(json_loads(json_dumps(DATA)), DATA, backend.__name__)
+            self.assertEqual(json_loads(json_dumps(DATA).encode('utf-8')), DATA, backend.__name__)
+            self.assertEqual(json_loads('{"a": NaN}').keys(), {'a'})
+
+    def test_non_finite(self):
+        for backend in self.backends():
+            for value in (float('nan'), float('inf'), float('-inf')):
+                dumped = json_dumps({'rows': [{'span': value}]})
+                self.assertFalse(math.isfinite(json_loads(dumped)['rows'][0]['span']), backend.__name__)
+
+    def test_pretty(self):
+        expected = json.dumps(DATA, sort_keys=True, indent=4, separators=(',', ': '))
+
+        for backend in self.backends():
+            self.assertEqual(json_pretty(DATA), expected, backend.__name__)
+
+    def test_auto(self):
+        json_backend.cache_clear()
+        names = [name for name in JSON_BACKENDS if try_import(name)]
+
+        self.assertEqual(json_backend().__name__, names[0])
+
+    def test_unknown_backend(self):
+        for name in ('os', 'simplejson'):
+            json_backend.cache_clear()
+            with patch.dict(config['grafcli'], {'json': name}):
+                with self.assertRaises(ConfigError):
+                    json_backend()
+
+    def test_missing_backend(self):
+        json_backend.cache_clear()
+        with patch.dict(config['grafcli'], {'json': 'orjson'}), \
+                patch('grafcli.utils.try_import', return_value=None):
+            with self.assertRaises(ConfigError):
+                json_backend()
+
+
+if __name__ == "__main__":
+    unittest.main()